@@ -117,8 +117,13 @@ export const AuthProvider = ({ children }) => {
   const updateProfile = async (profileData) => {
     try {
       const response = await axios.put("/api/users/me", profileData)
-      setUser(response.data)
-      setDarkMode(response.data.dark_mode || false)
+      const { access_token, user: userData } = response.data
+
+      localStorage.setItem("access_token", access_token)
+      axios.defaults.headers.common["Authorization"] = `Bearer ${access_token}`
+
+      setUser(userData)
+      setDarkMode(userData.dark_mode || false)
       return { success: true }
     } catch (error) {
       return {
@@ -131,7 +136,9 @@ export const AuthProvider = ({ children }) => {
   const toggleDarkMode = async () => {
     const newDarkMode = !darkMode
     try {
-      await axios.put("/api/users/me", { dark_mode: newDarkMode })
+      const response = await axios.put("/api/users/me", { dark_mode: newDarkMode })
+      localStorage.setItem("access_token", response.data.access_token)
+      axios.defaults.headers.common["Authorization"] = `Bearer ${response.data.access_token}`
       setDarkMode(newDarkMode)
       setUser((prev) => ({ ...prev, dark_mode: newDarkMode }))
     } catch (error) {
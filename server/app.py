@@ -1,11 +1,30 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager, jwt_required, create_access_token, create_refresh_token, get_jwt_identity, get_jwt
-from models import db, User, Project, PairingRequest, ProjectCollaborator, Milestone, Notification, Comment
+from models import db, User, Project, PairingRequest, ProjectCollaborator, Milestone, Notification, Comment, username_key
 from config import config
+from database import configure_engine
+from compression import init_compression
+from ratelimit import init_rate_limits
+from purge import init_purger, purge_project
+from reminders import init_reminders
+from routing import remember_writer
+from feed import init_feed
+from transfer import init_transfer
+from coalesce import init_single_flight
+from stats import init_user_stats, project_participants, refresh_project_owner_stats, refresh_user_stats, user_stats
+from changelog import change, changes_since, init_changelog, record_changes, ResyncRequired
+from fieldsets import Fieldset, FieldsetError
+import reads
+from authz import check_project_access, invalidate_project_roles, OWNER_ROLES
+from sqlalchemy import case, select, update, insert, func, literal
+from sqlalchemy.exc import IntegrityError
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.security import check_password_hash
 import os
 import json
+import time
 from datetime import datetime
 
 def create_app(config_name=None):
@@ -15,9 +34,23 @@ def create_app(config_name=None):
         config_name = os.environ.get('FLASK_ENV', 'development')
     
     app.config.from_object(config[config_name])
+    proxies = app.config.get('TRUSTED_PROXIES', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
     
     db.init_app(app)
-    migrate = Migrate(app, db)
+    configure_engine(app)
+    migrate = Migrate(app, db, render_as_batch=True)
+    # Registered first so it runs after every other after_request handler
+    compression_stats = init_compression(app)
+    init_rate_limits(app)
+    project_purger = init_purger(app)
+    init_changelog(app)
+    init_reminders(app)
+    public_feed = init_feed(app)
+    init_user_stats(app)
+    init_transfer(app)
+    single_flight = init_single_flight(app)
     CORS(app)
     jwt = JWTManager(app)
     
@@ -28,6 +61,48 @@ def create_app(config_name=None):
     def check_if_token_revoked(jwt_header, jwt_payload):
         return jwt_payload['jti'] in blacklisted_tokens
     
+    @app.errorhandler(FieldsetError)
+    def handle_fieldset_error(e):
+        return jsonify({'error': str(e)}), 400
+    
+    # Versioned /auth/me payloads: user_id -> (profile_version, payload, expires_at).
+    # Per process; the TTL bounds staleness when another worker bumped the version.
+    profile_cache = {}
+    
+    # Identity fields embedded in access tokens
+    identity_fields = ('username', 'full_name', 'experience_level', 'dark_mode', 'profile_version')
+    profile_columns = [column for column in User.__table__.columns if column.key != 'password_hash']
+    
+    def identity_claims(user):
+        return {field: getattr(user, field) for field in identity_fields}
+    
+    def issue_access_token(user):
+        return create_access_token(identity=user.id, additional_claims=identity_claims(user))
+    
+    # Columns of the public profile projection; everything else stays private
+    public_profile_columns = [getattr(User, name) for name in (
+        'id', 'username', 'full_name', 'email', 'bio', 'github_url', 'linkedin_url', 'portfolio_url',
+        'skills', 'experience_level', 'avatar_url', 'is_available', 'created_at'
+    )]
+    
+    def row_payload(row, columns):
+        payload = {column.key: getattr(row, column.key) for column in columns}
+        for key, value in payload.items():
+            if isinstance(value, datetime):
+                payload[key] = value.strftime('%Y-%m-%d %H:%M:%S')
+        return payload
+    
+    def cache_profile(user_id, row):
+        payload = row_payload(row, profile_columns)
+        profile_cache[user_id] = (row.profile_version, payload, time.monotonic() + app.config['PROFILE_CACHE_TTL'])
+        return payload
+    
+    def cached_profile(user_id, profile_version):
+        cached = profile_cache.get(user_id)
+        if cached and cached[0] >= profile_version and cached[2] > time.monotonic():
+            return cached[1]
+        return None
+    
     # Helper function to create notifications
     def create_notification(user_id, title, message, notification_type):
         notification = Notification(
@@ -44,13 +119,6 @@ def create_app(config_name=None):
         try:
             data = request.get_json()
             
-            # Check if user already exists
-            if User.query.filter_by(username=data['username']).first():
-                return jsonify({'error': 'Username already exists'}), 400
-            
-            if User.query.filter_by(email=data['email']).first():
-                return jsonify({'error': 'Email already exists'}), 400
-            
             user = User(
                 username=data['username'],
                 email=data['email'],
@@ -59,35 +127,58 @@ def create_app(config_name=None):
             )
             user.set_password(data['password'])
             
+            # One INSERT; the unique constraints catch existing usernames and emails,
+            # including concurrent sign-ups
             db.session.add(user)
-            db.session.commit()
-            
-            access_token = create_access_token(identity=user.id)
+            try:
+                db.session.flush()
+            except IntegrityError as e:
+                db.session.rollback()
+                message = str(e.orig).lower()
+                if 'username' in message:
+                    return jsonify({'error': 'Username already exists'}), 400
+                if 'email' in message:
+                    return jsonify({'error': 'Email already exists'}), 400
+                raise
+            
+            # Built before the commit expires the instance
+            payload = cache_profile(user.id, user)
+            remember_writer(user.id)
+            access_token = issue_access_token(user)
             refresh_token = create_refresh_token(identity=user.id)
+            db.session.commit()
             
             return jsonify({
                 'access_token': access_token,
                 'refresh_token': refresh_token,
-                'user': user.to_dict()
+                'user': payload
             }), 201
             
         except Exception as e:
+            db.session.rollback()
             return jsonify({'error': str(e)}), 400
     
     @app.route('/api/auth/login', methods=['POST'])
     def login():
         try:
             data = request.get_json()
-            user = User.query.filter_by(username=data['username']).first()
+            user = db.session.execute(
+                select(User.id, User.password_hash, *[getattr(User, field) for field in identity_fields])
+                .where(User.username_key == username_key(data['username']))
+            ).first()
             
-            if user and user.check_password(data['password']):
-                access_token = create_access_token(identity=user.id)
+            if user and check_password_hash(user.password_hash, data['password']):
+                access_token = issue_access_token(user)
                 refresh_token = create_refresh_token(identity=user.id)
                 
+                payload = cached_profile(user.id, user.profile_version) or cache_profile(user.id, db.session.execute(
+                    select(*profile_columns).where(User.id == user.id)
+                ).first())
+                
                 return jsonify({
                     'access_token': access_token,
                     'refresh_token': refresh_token,
-                    'user': user.to_dict()
+                    'user': payload
                 })
             else:
                 return jsonify({'error': 'Invalid credentials'}), 401
@@ -106,21 +197,105 @@ def create_app(config_name=None):
     @jwt_required(refresh=True)
     def refresh():
         current_user_id = get_jwt_identity()
-        new_token = create_access_token(identity=current_user_id)
+        user = db.session.execute(
+            select(User.id, *[getattr(User, field) for field in identity_fields])
+            .where(User.id == current_user_id)
+        ).first()
+        
+        if user is None:
+            return jsonify({'error': 'User not found'}), 404
+        
+        new_token = issue_access_token(user)
         return jsonify({'access_token': new_token})
     
     @app.route('/api/auth/me', methods=['GET'])
     @jwt_required()
     def get_current_user():
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        return jsonify(user.to_dict())
+        claims = get_jwt()
+        
+        # ?view=identity answers straight from the token claims
+        if request.args.get('view') == 'identity' and 'profile_version' in claims:
+            identity = {field: claims[field] for field in identity_fields}
+            identity['id'] = current_user_id
+            return jsonify(identity)
+        
+        # Serve the cached profile unless the token carries a newer version
+        cached = cached_profile(current_user_id, claims.get('profile_version', 0))
+        if cached is not None:
+            return jsonify(cached)
+        
+        user = db.session.execute(
+            select(*profile_columns).where(User.id == current_user_id)
+        ).first()
+        
+        if user is None:
+            return jsonify({'error': 'User not found'}), 404
+        
+        return jsonify(cache_profile(current_user_id, user))
     
     # User profile routes
     @app.route('/api/users/<int:user_id>', methods=['GET'])
     def get_user_profile(user_id):
-        user = User.query.get_or_404(user_id)
-        return jsonify(user.to_dict())
+        # Public columns only; related records are served, filtered, by the
+        # paginated /projects, /collaborations and /comments routes
+        if request.args.get('include'):
+            return jsonify({'error': 'include is not supported here; use /api/users/<id>/projects, /collaborations or /comments'}), 400
+        
+        fieldset = Fieldset.from_request(User)
+        if fieldset.sparse:
+            fieldset.restrict({column.key for column in public_profile_columns})
+            user = User.query.options(*fieldset.options()).filter_by(id=user_id).first_or_404()
+            return jsonify(fieldset.serialize(user))
+        
+        # Core columns plus the maintained stats row: two primary-key lookups
+        # however active the user is
+        row = db.session.execute(select(*public_profile_columns).where(User.id == user_id)).first()
+        if row is None:
+            return jsonify({'error': 'User not found'}), 404
+        return jsonify({**row_payload(row, public_profile_columns), 'stats': user_stats(user_id)})
+    
+    def user_collection(user_id, query, model, key):
+        # Related users and their records are not filtered to public ones here
+        if request.args.get('include'):
+            return jsonify({'error': 'include is not supported on user listings'}), 400
+        if db.session.scalar(select(User.id).where(User.id == user_id)) is None:
+            return jsonify({'error': 'User not found'}), 404
+        
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 10, type=int), 100)
+        fieldset = Fieldset.from_request(model)
+        if not fieldset.sparse:
+            fieldset = Fieldset.columns(model)
+        
+        items = query.options(*fieldset.options()).paginate(page=page, per_page=per_page, error_out=False)
+        return jsonify({
+            key: [fieldset.serialize(item) for item in items.items],
+            'total': items.total,
+            'pages': items.pages,
+            'current_page': page
+        })
+    
+    @app.route('/api/users/<int:user_id>/projects', methods=['GET'])
+    def get_user_projects(user_id):
+        query = Project.query.filter_by(owner_id=user_id, is_public=True, deleted_at=None).order_by(
+            Project.created_at.desc(), Project.id.desc()
+        )
+        return user_collection(user_id, query, Project, 'projects')
+    
+    @app.route('/api/users/<int:user_id>/collaborations', methods=['GET'])
+    def get_user_collaborations(user_id):
+        query = Project.query.join(ProjectCollaborator).filter(
+            ProjectCollaborator.user_id == user_id, Project.is_public.is_(True), Project.deleted_at.is_(None)
+        ).order_by(ProjectCollaborator.joined_at.desc(), Project.id.desc())
+        return user_collection(user_id, query, Project, 'projects')
+    
+    @app.route('/api/users/<int:user_id>/comments', methods=['GET'])
+    def get_user_comments(user_id):
+        query = Comment.query.join(Project).filter(
+            Comment.author_id == user_id, Project.is_public.is_(True), Project.deleted_at.is_(None)
+        ).order_by(Comment.created_at.desc(), Comment.id.desc())
+        return user_collection(user_id, query, Comment, 'comments')
     
     @app.route('/api/users/me', methods=['PUT'])
     @jwt_required()
@@ -137,9 +312,15 @@ def create_app(config_name=None):
                     setattr(user, field, data[field])
             
             user.updated_at = datetime.utcnow()
+            # Bumped in SQL so concurrent updates each get their own version
+            user.profile_version = User.profile_version + 1
             db.session.commit()
             
-            return jsonify(user.to_dict())
+            # The old token's identity claims and profile_version are stale now
+            return jsonify({
+                'access_token': issue_access_token(user),
+                'user': cache_profile(user.id, user)
+            })
             
         except Exception as e:
             return jsonify({'error': str(e)}), 400
@@ -152,28 +333,15 @@ def create_app(config_name=None):
         search = request.args.get('search', '')
         status = request.args.get('status', '')
         difficulty = request.args.get('difficulty', '')
+        fieldset = Fieldset.from_request(Project)
         
-        query = Project.query.filter_by(is_public=True)
-        
-        if search:
-            query = query.filter(Project.title.contains(search) | Project.description.contains(search))
-        
-        if status:
-            query = query.filter_by(status=status)
+        # The default newest-first listing is the same for everyone
+        if not (search or status or difficulty or fieldset.sparse):
+            feed_page = public_feed.page(page, per_page)
+            if feed_page is not None:
+                return jsonify(feed_page)
         
-        if difficulty:
-            query = query.filter_by(difficulty_level=difficulty)
-        
-        projects = query.order_by(Project.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'projects': [project.to_dict() for project in projects.items],
-            'total': projects.total,
-            'pages': projects.pages,
-            'current_page': page
-        })
+        return jsonify(reads.project_page(db.session, fieldset, page, per_page, search, status, difficulty))
     
     @app.route('/api/projects', methods=['POST'])
     @jwt_required()
@@ -195,6 +363,9 @@ def create_app(config_name=None):
             )
             
             db.session.add(project)
+            db.session.flush()
+            record_changes(change('project', project.id, project.id))
+            refresh_user_stats(project.owner_id)
             db.session.commit()
             
             return jsonify(project.to_dict()), 201
@@ -202,21 +373,26 @@ def create_app(config_name=None):
         except Exception as e:
             return jsonify({'error': str(e)}), 400
     
+    # Project detail, milestones and comments are shared links opened by many
+    # users at once, and their responses do not depend on the caller
     @app.route('/api/projects/<int:project_id>', methods=['GET'])
+    @single_flight(public=True)
     def get_project(project_id):
-        project = Project.query.get_or_404(project_id)
-        return jsonify(project.to_dict())
+        project = reads.project_detail(db.session, Fieldset.from_request(Project), project_id)
+        if project is None:
+            abort(404)
+        return jsonify(project)
     
     @app.route('/api/projects/<int:project_id>', methods=['PUT'])
     @jwt_required()
     def update_project(project_id):
         try:
-            current_user_id = get_jwt_identity()
-            project = Project.query.get_or_404(project_id)
-            
-            if project.owner_id != current_user_id:
-                return jsonify({'error': 'Unauthorized'}), 403
+            denied = check_project_access(project_id, OWNER_ROLES)
+            if denied:
+                return denied
             
+            project = Project.query.get_or_404(project_id)
+            was_public = project.is_public
             data = request.get_json()
             allowed_fields = ['title', 'description', 'tech_stack', 'tags', 'difficulty_level', 'status', 'repository_url', 'demo_url', 'max_collaborators', 'is_public']
             
@@ -225,6 +401,10 @@ def create_app(config_name=None):
                     setattr(project, field, data[field])
             
             project.updated_at = datetime.utcnow()
+            entry = change('project', project.id, project.id)
+            if was_public and not project.is_public:
+                entry.update(owner_id=project.owner_id, is_public=True)
+            record_changes(entry)
             db.session.commit()
             
             return jsonify(project.to_dict())
@@ -235,14 +415,33 @@ def create_app(config_name=None):
     @app.route('/api/projects/<int:project_id>', methods=['DELETE'])
     @jwt_required()
     def delete_project(project_id):
-        current_user_id = get_jwt_identity()
-        project = Project.query.get_or_404(project_id)
+        denied = check_project_access(project_id, OWNER_ROLES)
+        if denied:
+            return denied
         
-        if project.owner_id != current_user_id:
-            return jsonify({'error': 'Unauthorized'}), 403
+        participants = project_participants(project_id)
         
-        db.session.delete(project)
-        db.session.commit()
+        # Children are removed with chunked set-based DELETEs instead of loading
+        # every cascaded row through the ORM
+        if app.config['PROJECT_SOFT_DELETE']:
+            db.session.execute(
+                update(Project)
+                .where(Project.id == project_id)
+                .values(deleted_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            record_changes(change('project', project_id, project_id, op='delete'))
+            refresh_user_stats(*participants)
+            db.session.commit()
+            project_purger.enqueue(project_id)
+        else:
+            record_changes(change('project', project_id, project_id, op='delete'))
+            db.session.commit()
+            purge_project(project_id, project_purger.chunk_size)
+            refresh_user_stats(*participants)
+            db.session.commit()
+        
+        invalidate_project_roles(project_id)
         
         return '', 204
     
@@ -250,28 +449,28 @@ def create_app(config_name=None):
     @jwt_required()
     def get_my_projects():
         current_user_id = get_jwt_identity()
-        projects = Project.query.filter_by(owner_id=current_user_id).order_by(Project.created_at.desc()).all()
-        return jsonify([project.to_dict() for project in projects])
+        fieldset = Fieldset.from_request(Project)
+        projects = Project.query.options(*fieldset.options()).filter_by(owner_id=current_user_id, deleted_at=None).order_by(Project.created_at.desc()).all()
+        return jsonify([fieldset.serialize(project) for project in projects])
     
     # Pairing requests routes
     @app.route('/api/projects/<int:project_id>/pairing-requests', methods=['GET'])
     @jwt_required()
     def get_project_pairing_requests(project_id):
-        current_user_id = get_jwt_identity()
-        project = Project.query.get_or_404(project_id)
-        
-        if project.owner_id != current_user_id:
-            return jsonify({'error': 'Unauthorized'}), 403
+        denied = check_project_access(project_id, OWNER_ROLES)
+        if denied:
+            return denied
         
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        fieldset = Fieldset.from_request(PairingRequest)
         
-        requests = PairingRequest.query.filter_by(project_id=project_id).order_by(
+        requests = PairingRequest.query.options(*fieldset.options()).filter_by(project_id=project_id).order_by(
             PairingRequest.created_at.desc()
         ).paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'requests': [req.to_dict() for req in requests.items],
+            'requests': [fieldset.serialize(req) for req in requests.items],
             'total': requests.total,
             'pages': requests.pages,
             'current_page': page
@@ -282,7 +481,7 @@ def create_app(config_name=None):
     def create_pairing_request(project_id):
         try:
             current_user_id = get_jwt_identity()
-            project = Project.query.get_or_404(project_id)
+            project = Project.query.filter_by(id=project_id, deleted_at=None).first_or_404()
             
             # Check if user already has a request for this project
             existing_request = PairingRequest.query.filter_by(
@@ -301,6 +500,8 @@ def create_app(config_name=None):
             )
             
             db.session.add(pairing_request)
+            db.session.flush()
+            record_changes(change('pairing_request', pairing_request.id, project_id, user_id=current_user_id))
             
             # Create notification for project owner
             create_notification(
@@ -322,25 +523,101 @@ def create_app(config_name=None):
     def update_pairing_request(request_id):
         try:
             current_user_id = get_jwt_identity()
-            pairing_request = PairingRequest.query.get_or_404(request_id)
-            
-            # Only project owner can update request status
-            if pairing_request.project.owner_id != current_user_id:
-                return jsonify({'error': 'Unauthorized'}), 403
-            
             data = request.get_json()
-            pairing_request.status = data['status']
-            pairing_request.response_message = data.get('response_message', '')
-            pairing_request.updated_at = datetime.utcnow()
-            
-            # If approved, add user as collaborator
-            if data['status'] == 'approved':
-                collaborator = ProjectCollaborator(
-                    user_id=pairing_request.requester_id,
-                    project_id=pairing_request.project_id,
-                    role='contributor'
+            new_status = data['status']
+            
+            if new_status not in ('approved', 'rejected'):
+                return jsonify({'error': 'Status must be one of: approved, rejected'}), 400
+            
+            now = datetime.utcnow()
+            
+            # Claim the request in a single conditional UPDATE: only a pending
+            # request on a project owned by the current user can transition.
+            owned_project = select(Project.id).where(
+                Project.id == PairingRequest.project_id,
+                Project.owner_id == current_user_id,
+                Project.deleted_at.is_(None)
+            ).exists()
+            claimed = db.session.execute(
+                update(PairingRequest)
+                .where(
+                    PairingRequest.id == request_id,
+                    PairingRequest.status == 'pending',
+                    owned_project
+                )
+                .values(
+                    status=new_status,
+                    response_message=data.get('response_message', ''),
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            
+            if claimed.rowcount == 0:
+                db.session.rollback()
+                row = db.session.execute(
+                    select(PairingRequest.status, Project.owner_id)
+                    .join(Project, Project.id == PairingRequest.project_id)
+                    .where(PairingRequest.id == request_id)
+                ).first()
+                
+                if row is None:
+                    return jsonify({'error': 'Pairing request not found'}), 404
+                if row.owner_id != current_user_id:
+                    return jsonify({'error': 'Unauthorized'}), 403
+                return jsonify({'error': f'Pairing request has already been {row.status}'}), 409
+            
+            # Lock the project row (no-op on SQLite, where the UPDATE above
+            # already holds the write lock) so approvals on the same project
+            # serialize while other projects proceed in parallel.
+            target = db.session.execute(
+                select(PairingRequest.requester_id, PairingRequest.project_id)
+                .join(Project, Project.id == PairingRequest.project_id)
+                .where(PairingRequest.id == request_id)
+                .with_for_update(of=Project)
+            ).one()
+            
+            # If approved, add user as collaborator while there is capacity left
+            if new_status == 'approved':
+                collaborator_count = select(func.count(ProjectCollaborator.id)).where(
+                    ProjectCollaborator.project_id == target.project_id
+                ).scalar_subquery()
+                has_capacity = select(
+                    literal(target.requester_id),
+                    literal(target.project_id),
+                    literal('contributor'),
+                    literal(now)
+                ).where(
+                    select(Project.max_collaborators)
+                    .where(Project.id == target.project_id)
+                    .scalar_subquery() > collaborator_count
+                )
+                
+                try:
+                    added = db.session.execute(
+                        insert(ProjectCollaborator).from_select(
+                            ['user_id', 'project_id', 'role', 'joined_at'],
+                            has_capacity
+                        )
+                    )
+                except IntegrityError:
+                    db.session.rollback()
+                    return jsonify({'error': 'User is already a collaborator on this project'}), 409
+                
+                if added.rowcount == 0:
+                    db.session.rollback()
+                    return jsonify({'error': 'Project has reached its maximum number of collaborators'}), 409
+                
+                collaborator_id = db.session.scalar(
+                    select(ProjectCollaborator.id).where(
+                        ProjectCollaborator.user_id == target.requester_id,
+                        ProjectCollaborator.project_id == target.project_id
+                    )
                 )
-                db.session.add(collaborator)
+                record_changes(change('collaborator', collaborator_id, target.project_id, user_id=target.requester_id))
+                refresh_user_stats(target.requester_id)
+            
+            record_changes(change('pairing_request', request_id, target.project_id, user_id=target.requester_id))
             
             # Create notification for requester
             status_message = {
@@ -349,49 +626,47 @@ def create_app(config_name=None):
             }
             
             create_notification(
-                pairing_request.requester_id,
+                target.requester_id,
                 'Pairing Request Update',
-                status_message.get(data['status'], 'Your pairing request status has been updated.'),
+                status_message[new_status],
                 'pairing_request_update'
             )
             
             db.session.commit()
             
-            return jsonify(pairing_request.to_dict())
+            if new_status == 'approved':
+                invalidate_project_roles(target.project_id, target.requester_id)
+            
+            pairing_request = db.session.get(PairingRequest, request_id)
+            return jsonify(pairing_request.to_dict(rules=('-requester', '-project')))
             
         except Exception as e:
+            db.session.rollback()
             return jsonify({'error': str(e)}), 400
     
     @app.route('/api/users/me/pairing-requests', methods=['GET'])
     @jwt_required()
     def get_my_pairing_requests():
         current_user_id = get_jwt_identity()
-        requests = PairingRequest.query.filter_by(requester_id=current_user_id).order_by(
+        fieldset = Fieldset.from_request(PairingRequest)
+        requests = PairingRequest.query.options(*fieldset.options()).filter_by(requester_id=current_user_id).order_by(
             PairingRequest.created_at.desc()
         ).all()
-        return jsonify([req.to_dict() for req in requests])
+        return jsonify([fieldset.serialize(req) for req in requests])
     
     # Milestones routes
     @app.route('/api/projects/<int:project_id>/milestones', methods=['GET'])
+    @single_flight(public=True)
     def get_project_milestones(project_id):
-        milestones = Milestone.query.filter_by(project_id=project_id).order_by(Milestone.created_at.asc()).all()
-        return jsonify([milestone.to_dict() for milestone in milestones])
+        return jsonify(reads.project_milestones(db.session, Fieldset.from_request(Milestone), project_id))
     
     @app.route('/api/projects/<int:project_id>/milestones', methods=['POST'])
     @jwt_required()
     def create_milestone(project_id):
         try:
-            current_user_id = get_jwt_identity()
-            project = Project.query.get_or_404(project_id)
-            
-            # Check if user is owner or collaborator
-            is_collaborator = ProjectCollaborator.query.filter_by(
-                user_id=current_user_id,
-                project_id=project_id
-            ).first()
-            
-            if project.owner_id != current_user_id and not is_collaborator:
-                return jsonify({'error': 'Unauthorized'}), 403
+            denied = check_project_access(project_id)
+            if denied:
+                return denied
             
             data = request.get_json()
             milestone = Milestone(
@@ -402,6 +677,8 @@ def create_app(config_name=None):
             )
             
             db.session.add(milestone)
+            db.session.flush()
+            record_changes(change('milestone', milestone.id, project_id))
             db.session.commit()
             
             return jsonify(milestone.to_dict()), 201
@@ -413,17 +690,11 @@ def create_app(config_name=None):
     @jwt_required()
     def update_milestone(milestone_id):
         try:
-            current_user_id = get_jwt_identity()
             milestone = Milestone.query.get_or_404(milestone_id)
             
-            # Check if user is owner or collaborator
-            is_collaborator = ProjectCollaborator.query.filter_by(
-                user_id=current_user_id,
-                project_id=milestone.project_id
-            ).first()
-            
-            if milestone.project.owner_id != current_user_id and not is_collaborator:
-                return jsonify({'error': 'Unauthorized'}), 403
+            denied = check_project_access(milestone.project_id)
+            if denied:
+                return denied
             
             data = request.get_json()
             allowed_fields = ['title', 'description', 'is_completed', 'due_date']
@@ -439,6 +710,9 @@ def create_app(config_name=None):
                         setattr(milestone, field, data[field])
             
             milestone.updated_at = datetime.utcnow()
+            record_changes(change('milestone', milestone.id, milestone.project_id))
+            if 'is_completed' in data:
+                refresh_project_owner_stats(milestone.project_id)
             db.session.commit()
             
             return jsonify(milestone.to_dict())
@@ -449,32 +723,190 @@ def create_app(config_name=None):
     @app.route('/api/milestones/<int:milestone_id>', methods=['DELETE'])
     @jwt_required()
     def delete_milestone(milestone_id):
-        current_user_id = get_jwt_identity()
         milestone = Milestone.query.get_or_404(milestone_id)
         
-        # Check if user is owner or collaborator
-        is_collaborator = ProjectCollaborator.query.filter_by(
-            user_id=current_user_id,
-            project_id=milestone.project_id
-        ).first()
-        
-        if milestone.project.owner_id != current_user_id and not is_collaborator:
-            return jsonify({'error': 'Unauthorized'}), 403
+        denied = check_project_access(milestone.project_id)
+        if denied:
+            return denied
         
         db.session.delete(milestone)
+        record_changes(change('milestone', milestone.id, milestone.project_id, op='delete'))
+        if milestone.is_completed:
+            refresh_project_owner_stats(milestone.project_id)
         db.session.commit()
         
         return '', 204
     
+    # Bulk milestone routes: authorize once, validate every item, write in one transaction
+    def parse_milestone_item(item, partial):
+        if not isinstance(item, dict):
+            return None, 'Each milestone must be an object'
+        
+        values = {}
+        if 'title' in item or not partial:
+            title = item.get('title')
+            if not isinstance(title, str) or not title.strip() or len(title) > 200:
+                return None, 'title is required and must be at most 200 characters'
+            values['title'] = title
+        
+        if 'description' in item:
+            values['description'] = item['description'] or ''
+        elif not partial:
+            values['description'] = ''
+        
+        if item.get('due_date'):
+            try:
+                values['due_date'] = datetime.fromisoformat(item['due_date'])
+            except (TypeError, ValueError):
+                return None, 'due_date must be an ISO 8601 date'
+        elif 'due_date' in item:
+            values['due_date'] = None
+        
+        if partial and 'is_completed' in item:
+            if not isinstance(item['is_completed'], bool):
+                return None, 'is_completed must be true or false'
+            values['is_completed'] = item['is_completed']
+        
+        return values, None
+    
+    def bulk_items():
+        data = request.get_json(silent=True)
+        items = data.get('milestones') if isinstance(data, dict) else data
+        
+        if not isinstance(items, list) or not items:
+            return None, (jsonify({'error': 'Expected a non-empty list of milestones'}), 400)
+        if len(items) > app.config['MAX_BULK_ITEMS']:
+            return None, (jsonify({'error': f'At most {app.config["MAX_BULK_ITEMS"]} milestones per request'}), 400)
+        return items, None
+    
+    def bulk_rejected(results):
+        return jsonify({'error': 'No milestones were saved', 'results': results}), 400
+    
+    @app.route('/api/projects/<int:project_id>/milestones/bulk', methods=['POST'])
+    @jwt_required()
+    def bulk_create_milestones(project_id):
+        denied = check_project_access(project_id)
+        if denied:
+            return denied
+        
+        items, error = bulk_items()
+        if error:
+            return error
+        
+        rows, results = [], []
+        for index, item in enumerate(items):
+            values, message = parse_milestone_item(item, partial=False)
+            if message:
+                results.append({'index': index, 'status': 400, 'error': message})
+            else:
+                # Same keys in every row so the batch goes out as one multi-row INSERT
+                rows.append({'due_date': None, **values, 'project_id': project_id})
+        
+        if results:
+            return bulk_rejected(results)
+        
+        try:
+            milestones = db.session.scalars(
+                insert(Milestone).returning(Milestone, sort_by_parameter_order=True),
+                rows,
+                execution_options={'render_nulls': True}
+            ).all()
+            results = [
+                {'index': index, 'status': 201, 'milestone': milestone.to_dict(rules=('-project',))}
+                for index, milestone in enumerate(milestones)
+            ]
+            record_changes(*[change('milestone', milestone.id, project_id) for milestone in milestones])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'results': results}), 201
+    
+    @app.route('/api/projects/<int:project_id>/milestones/bulk', methods=['PATCH'])
+    @jwt_required()
+    def bulk_update_milestones(project_id):
+        denied = check_project_access(project_id)
+        if denied:
+            return denied
+        
+        items, error = bulk_items()
+        if error:
+            return error
+        
+        def item_id(item):
+            milestone_id = item.get('id') if isinstance(item, dict) else None
+            return milestone_id if isinstance(milestone_id, int) and not isinstance(milestone_id, bool) else None
+        
+        ids = [item_id(item) for item in items if item_id(item) is not None]
+        current = {
+            row.id: row for row in db.session.execute(
+                select(Milestone.id, Milestone.is_completed)
+                .where(Milestone.project_id == project_id, Milestone.id.in_(ids))
+            )
+        }
+        
+        now = datetime.utcnow()
+        rows, results, seen = [], [], set()
+        for index, item in enumerate(items):
+            values, message = parse_milestone_item(item, partial=True)
+            milestone_id = item_id(item)
+            
+            if not message and milestone_id is None:
+                results.append({'index': index, 'id': item.get('id'), 'status': 400, 'error': 'Milestone id must be an integer'})
+                continue
+            if not message and milestone_id not in current:
+                results.append({'index': index, 'id': milestone_id, 'status': 404, 'error': 'Milestone not found in this project'})
+                continue
+            if not message and milestone_id in seen:
+                message = 'Milestone listed more than once'
+            if message:
+                results.append({'index': index, 'id': milestone_id, 'status': 400, 'error': message})
+                continue
+            
+            seen.add(milestone_id)
+            if values.get('is_completed') and not current[milestone_id].is_completed:
+                values['completed_at'] = now
+            rows.append({**values, 'id': milestone_id, 'updated_at': now})
+        
+        if results:
+            return bulk_rejected(results)
+        
+        # One UPDATE for the whole batch: each column becomes CASE id WHEN ... END,
+        # falling back to its current value for rows that do not touch it
+        ids = [row['id'] for row in rows]
+        assignments = {}
+        for key in {key for row in rows for key in row if key != 'id'}:
+            whens = {row['id']: row[key] for row in rows if key in row}
+            assignments[key] = case(whens, value=Milestone.id, else_=getattr(Milestone, key))
+        
+        try:
+            db.session.execute(
+                update(Milestone)
+                .where(Milestone.id.in_(ids))
+                .values(**assignments)
+                .execution_options(synchronize_session=False)
+            )
+            milestones = {milestone.id: milestone for milestone in Milestone.query.filter(Milestone.id.in_(ids))}
+            results = [
+                {'index': index, 'id': row['id'], 'status': 200, 'milestone': milestones[row['id']].to_dict(rules=('-project',))}
+                for index, row in enumerate(rows)
+            ]
+            record_changes(*[change('milestone', milestone_id, project_id) for milestone_id in ids])
+            if any('is_completed' in row for row in rows):
+                refresh_project_owner_stats(project_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'results': results})
+    
     # Notifications routes
     @app.route('/api/users/me/notifications', methods=['GET'])
     @jwt_required()
     def get_notifications():
-        current_user_id = get_jwt_identity()
-        notifications = Notification.query.filter_by(user_id=current_user_id).order_by(
-            Notification.created_at.desc()
-        ).all()
-        return jsonify([notification.to_dict() for notification in notifications])
+        return jsonify(reads.user_notifications(db.session, Fieldset.from_request(Notification), get_jwt_identity()))
     
     @app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
     @jwt_required()
@@ -492,13 +924,15 @@ def create_app(config_name=None):
     
     # Comments routes
     @app.route('/api/projects/<int:project_id>/comments', methods=['GET'])
+    @single_flight(public=True)
     def get_project_comments(project_id):
-        comments = Comment.query.filter_by(project_id=project_id).order_by(Comment.created_at.asc()).all()
-        return jsonify([comment.to_dict() for comment in comments])
+        return jsonify(reads.project_comments(db.session, Fieldset.from_request(Comment), project_id))
     
     @app.route('/api/projects/<int:project_id>/comments', methods=['POST'])
     @jwt_required()
     def create_comment(project_id):
+        Project.query.filter_by(id=project_id, deleted_at=None).first_or_404()
+        
         try:
             current_user_id = get_jwt_identity()
             data = request.get_json()
@@ -510,6 +944,9 @@ def create_app(config_name=None):
             )
             
             db.session.add(comment)
+            db.session.flush()
+            record_changes(change('comment', comment.id, project_id))
+            refresh_user_stats(current_user_id)
             db.session.commit()
             
             return jsonify(comment.to_dict()), 201
@@ -524,8 +961,8 @@ def create_app(config_name=None):
         current_user_id = get_jwt_identity()
         
         # User's projects stats
-        owned_projects = Project.query.filter_by(owner_id=current_user_id).count()
-        completed_projects = Project.query.filter_by(owner_id=current_user_id, status='completed').count()
+        owned_projects = Project.query.filter_by(owner_id=current_user_id, deleted_at=None).count()
+        completed_projects = Project.query.filter_by(owner_id=current_user_id, status='completed', deleted_at=None).count()
         
         # Collaboration stats
         collaborations = ProjectCollaborator.query.filter_by(user_id=current_user_id).count()
@@ -546,6 +983,26 @@ def create_app(config_name=None):
             'unread_notifications': unread_notifications
         })
     
+    # Delta sync: changes visible to the caller since a change-log sequence number
+    @app.route('/api/sync', methods=['GET'])
+    @jwt_required(optional=True)
+    def sync_changes():
+        since = request.args.get('since', 0, type=int)
+        limit = min(request.args.get('limit', 500, type=int), 1000)
+        
+        try:
+            return jsonify(changes_since(since, get_jwt_identity(), limit))
+        except ResyncRequired:
+            return jsonify({'error': 'Changes before this point were compacted; refetch and sync from 0'}), 410
+    
+    # Per-process serving metrics
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        return jsonify({
+            'compression': compression_stats.to_dict(),
+            'coalescing': single_flight.stats.to_dict()
+        })
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,284 @@
+"""ASGI entry point with an async database path for read-heavy routes.
+
+    uvicorn --factory asgi:create_asgi_app --host 0.0.0.0 --port 5000
+    python asgi.py --port 5000
+
+GET requests for ASYNC_READ_ENDPOINTS run their queries on an async SQLAlchemy
+engine (aiosqlite, asyncpg, ...), so the event loop keeps serving other
+connections during the database round trip. They still go through the Flask
+request context and its before/after_request hooks (rate limits, compression,
+ETags, CORS). Every other request runs the WSGI app on a pool of ASGI_THREADS
+threads with the sync engine; responses are sent from the event loop, so a
+slow client never holds a thread.
+
+Needs an async driver for the database, e.g. pip install aiosqlite
+"""
+from app import create_app
+from models import db, ChangeLog, Project, Milestone, Notification, Comment
+from database import apply_sqlite_pragmas
+from fieldsets import Fieldset
+from flask import abort, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event, func, select
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+import argparse
+import asyncio
+import reads
+import sys
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_url(app):
+    """ASYNC_DATABASE_URL, else the app's own database with the async driver for its backend."""
+    if app.config.get('ASYNC_DATABASE_URL'):
+        return app.config['ASYNC_DATABASE_URL']
+    with app.app_context():
+        # Resolved URL: relative SQLite paths point into the instance folder
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise SystemExit(f'No async driver known for {backend}; set ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _environ(scope, body=b''):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.input_terminated': True,  # the whole body is buffered, even without Content-Length
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+async def _read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def _send_response(send, status, headers, chunks):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+
+
+# Async views: called inside the Flask request context with an AsyncSession and
+# the DevPairASGI server; they return the JSON payload or raise like the Flask
+# views they stand in for
+
+async def _get_projects(session, server):
+    args = request.args
+    page = args.get('page', 1, type=int)
+    per_page = args.get('per_page', 10, type=int)
+    search = args.get('search', '')
+    status = args.get('status', '')
+    difficulty = args.get('difficulty', '')
+    fieldset = Fieldset.from_request(Project)
+
+    if not (search or status or difficulty or fieldset.sparse):
+        # Serve the precomputed feed, refreshing it on the thread pool when stale
+        seq = await session.scalar(select(func.max(ChangeLog.seq))) or 0
+        if server.feed.size and not server.feed.is_current(seq):
+            try:
+                await server.in_thread(server.feed.refresh)
+            except Exception as e:
+                server.app.logger.warning('Refreshing the public project feed failed: %s', e)
+        cached = server.feed.cached_page(page, per_page, seq)
+        if cached is not None:
+            return cached
+
+    return await session.run_sync(reads.project_page, fieldset, page, per_page, search, status, difficulty)
+
+
+async def _get_project(session, server, project_id):
+    project = await session.run_sync(reads.project_detail, Fieldset.from_request(Project), project_id)
+    if project is None:
+        abort(404)
+    return project
+
+
+async def _get_project_milestones(session, server, project_id):
+    return await session.run_sync(reads.project_milestones, Fieldset.from_request(Milestone), project_id)
+
+
+async def _get_project_comments(session, server, project_id):
+    return await session.run_sync(reads.project_comments, Fieldset.from_request(Comment), project_id)
+
+
+async def _get_notifications(session, server):
+    verify_jwt_in_request()
+    return await session.run_sync(reads.user_notifications, Fieldset.from_request(Notification), get_jwt_identity())
+
+
+ASYNC_VIEWS = {
+    'get_projects': _get_projects,
+    'get_project': _get_project,
+    'get_project_milestones': _get_project_milestones,
+    'get_project_comments': _get_project_comments,
+    'get_notifications': _get_notifications,
+}
+
+
+class DevPairASGI:
+    """The Flask app over ASGI: async reads for ASYNC_READ_ENDPOINTS, a thread pool for the rest."""
+
+    def __init__(self, app, async_reads=True):
+        self.app = app
+        self.feed = app.extensions['public_feed']
+        self.executor = ThreadPoolExecutor(app.config.get('ASGI_THREADS', 8), thread_name_prefix='wsgi')
+        self.views = {}
+        self.engine = None
+        # The async path builds its request context without going through app.wsgi_app
+        proxies = app.config.get('TRUSTED_PROXIES', 0)
+        self.fix_proxy = ProxyFix(lambda environ, start_response: environ, x_for=proxies, x_proto=proxies) if proxies else None
+
+        if async_reads:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            # Pool sizing carries over; the sync pool class does not
+            options = {key: value for key, value in app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+                       if key != 'poolclass'}
+            self.engine = create_async_engine(async_database_url(app), **options)
+            pragmas = app.config.get('SQLITE_PRAGMAS')
+            if pragmas and self.engine.dialect.name == 'sqlite':
+                event.listen(self.engine.sync_engine, 'connect',
+                             lambda connection, record: apply_sqlite_pragmas(connection, pragmas))
+            self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+            self.views = {endpoint: ASYNC_VIEWS[endpoint] for endpoint in app.config.get('ASYNC_READ_ENDPOINTS', ())}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        body = await _read_body(receive)
+        environ = _environ(scope, body)
+        if self.views and scope['method'] == 'GET':
+            try:
+                endpoint, view_args = self.app.url_map.bind_to_environ(environ).match()
+            except HTTPException:
+                endpoint = None
+            if endpoint in self.views:
+                if self.fix_proxy:
+                    environ = self.fix_proxy(environ, None)
+                return await self._async_view(self.views[endpoint], environ, view_args, send)
+
+        loop = asyncio.get_running_loop()
+        status, headers, chunks = await loop.run_in_executor(self.executor, self._wsgi, environ)
+        await _send_response(send, status, headers, chunks)
+
+    async def in_thread(self, function, *args):
+        """Run a sync-engine call on the thread pool, in its own app context."""
+        def call():
+            with self.app.app_context():
+                return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    def _wsgi(self, environ):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        result = self.app(environ, start_response)
+        try:
+            chunks = list(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return started['status'], started['headers'], chunks
+
+    async def _async_view(self, view, environ, view_args, send):
+        # Flask's full_dispatch_request with an awaited view in the middle
+        app = self.app
+        with app.request_context(environ):
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    async with self.sessions() as session:
+                        rv = app.json.response(await view(session, self, **view_args))
+            except Exception as e:
+                try:
+                    rv = app.handle_user_exception(e)
+                except Exception as unhandled:
+                    rv = app.handle_exception(unhandled)
+            response = app.process_response(app.make_response(rv))
+            status, headers, chunks = response.status_code, list(response.headers.items()), list(response.iter_encoded())
+            response.close()
+        await _send_response(send, status, headers, chunks)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.engine is not None:
+                    await self.engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_name=None, async_reads=True):
+    return DevPairASGI(create_app(config_name), async_reads)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the app over ASGI with uvicorn.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--config', default=None, help='Config name (default: FLASK_ENV or development).')
+    parser.add_argument('--sync-only', action='store_true', help='Serve every route from the thread pool.')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('asgi.py needs an ASGI server: pip install uvicorn')
+
+    uvicorn.run(create_asgi_app(args.config, not args.sync_only), host=args.host, port=args.port)
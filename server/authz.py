@@ -0,0 +1,82 @@
+from flask import current_app, g, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import and_, select
+from models import db, Project, ProjectCollaborator
+from threading import Lock
+import time
+
+OWNER = 'owner'
+OWNER_ROLES = (OWNER,)
+MEMBER_ROLES = (OWNER, 'admin', 'contributor')
+
+# Returned by project_role when the project itself does not exist
+NO_PROJECT = object()
+
+# Cross-request cache: (user_id, project_id) -> (role, expires_at).
+# Only used when AUTHZ_CACHE_TTL > 0; entries are per process, so keep the
+# TTL short when running several workers.
+_role_cache = {}
+_role_cache_lock = Lock()
+
+
+def _load_project_role(user_id, project_id):
+    # Single query: project PK lookup plus the (user_id, project_id) unique index
+    row = db.session.execute(
+        select(Project.owner_id, ProjectCollaborator.role)
+        .outerjoin(ProjectCollaborator, and_(
+            ProjectCollaborator.project_id == Project.id,
+            ProjectCollaborator.user_id == user_id
+        ))
+        .where(Project.id == project_id, Project.deleted_at.is_(None))
+    ).first()
+
+    if row is None:
+        return NO_PROJECT
+    if row.owner_id == user_id:
+        return OWNER
+    return row.role
+
+
+def project_role(user_id, project_id):
+    """Return the user's role on a project: 'owner', a collaborator role, None or NO_PROJECT."""
+    key = (user_id, project_id)
+    memo = g.setdefault('project_roles', {})
+    if key in memo:
+        return memo[key]
+
+    ttl = current_app.config.get('AUTHZ_CACHE_TTL', 0)
+    if ttl:
+        with _role_cache_lock:
+            cached = _role_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            memo[key] = cached[0]
+            return cached[0]
+
+    role = _load_project_role(user_id, project_id)
+    memo[key] = role
+
+    if ttl:
+        with _role_cache_lock:
+            _role_cache[key] = (role, time.monotonic() + ttl)
+
+    return role
+
+
+def invalidate_project_roles(project_id, user_id=None):
+    """Drop memoized roles after a membership change on a project."""
+    memo = g.get('project_roles', {})
+    with _role_cache_lock:
+        for store in (memo, _role_cache):
+            for key in [k for k in store if k[1] == project_id and user_id in (None, k[0])]:
+                del store[key]
+
+
+def check_project_access(project_id, roles=MEMBER_ROLES):
+    """Return an error response if the current user lacks one of roles on the project, else None."""
+    role = project_role(get_jwt_identity(), project_id)
+
+    if role is NO_PROJECT:
+        return jsonify({'error': 'Project not found'}), 404
+    if role not in roles:
+        return jsonify({'error': 'Unauthorized'}), 403
+    return None
@@ -0,0 +1,182 @@
+"""Concurrent-connection capacity of the ASGI app with and without the async read path.
+
+Both modes serve the same app in-process through asgi.DevPairASGI: 'sync' runs
+every request on the ASGI_THREADS pool, 'async' runs the read routes on the
+async engine. Each simulated client loops over project detail, milestone,
+comment and listing GETs; --db-latency-ms adds a round trip to every query (as
+a networked database would) and --client-delay-ms makes clients slow readers.
+Rate limits, load shedding, coalescing and the precomputed feed are off so
+both modes do the same database work. The async path pays off once database
+round trips outweigh the per-request CPU spent in the ORM and serializer;
+compare --db-latency-ms 10 and 50.
+
+    python bench_asgi.py --clients 10 100 400 --seconds 5 --db-latency-ms 10
+"""
+from bench_sqlite import make_engine, prepare
+from config import ProductionConfig, config
+from models import User, Milestone, Comment
+from sqlalchemy import insert
+from datetime import datetime
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+DB_LATENCY = 0.0
+
+
+class SlowCursor(sqlite3.Cursor):
+    def execute(self, *args, **kwargs):
+        time.sleep(DB_LATENCY)
+        return super().execute(*args, **kwargs)
+
+
+class SlowConnection(sqlite3.Connection):
+    """Adds DB_LATENCY to every statement, in whichever thread runs it."""
+
+    def cursor(self, factory=SlowCursor):
+        return super().cursor(factory)
+
+
+def add_children(path, projects, milestones=3):
+    """Milestones for every project and one comment each by its own author, so the child routes serialize rows."""
+    engine = make_engine(path, 'production')
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            'username': f'reader{i}', 'username_key': f'reader{i}', 'email': f'reader{i}@example.com', 'full_name': f'Reader {i}',
+            'password_hash': 'x', 'experience_level': 'beginner', 'profile_version': 1
+        } for i in range(projects)])
+        connection.execute(insert(Milestone), [{
+            'project_id': project_id, 'title': f'Milestone {i}', 'created_at': now
+        } for project_id in range(1, projects + 1) for i in range(milestones)])
+        connection.execute(insert(Comment), [{
+            'project_id': project_id, 'author_id': project_id + 1, 'content': 'Benchmark comment', 'created_at': now
+        } for project_id in range(1, projects + 1)])
+    engine.dispose()
+
+
+def bench_config(path, threads, pool_size):
+    class BenchConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        SQLITE_STARTUP_CHECK = False
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            **ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS,
+            'pool_size': pool_size,
+            'max_overflow': 0,
+            'connect_args': {'factory': SlowConnection, 'check_same_thread': False},
+        }
+        ASGI_THREADS = threads
+        RATE_LIMITS = {}
+        MAX_CONCURRENT_REQUESTS = 0
+        ROUTE_CONCURRENCY = {}
+        COALESCE_GETS = False
+        PUBLIC_FEED_SIZE = 0
+
+    return BenchConfig
+
+
+def _scope(path):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'query_string': query.encode(), 'root_path': '',
+        'headers': [(b'host', b'bench')], 'client': ('127.0.0.1', 0), 'server': ('bench', 80),
+    }
+
+
+async def request(application, path, client_delay):
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif client_delay:
+            await asyncio.sleep(client_delay)
+
+    await application(_scope(path), receive, send)
+    return status
+
+
+async def run_clients(application, clients, seconds, projects, client_delay):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            project_id = random.randint(1, projects)
+            path = random.choice((
+                f'/api/projects/{project_id}',
+                f'/api/projects/{project_id}/milestones',
+                f'/api/projects/{project_id}/comments',
+                f'/api/projects?page={random.randint(1, 5)}&per_page=10',
+            ))
+            started = time.perf_counter()
+            status = await request(application, path, client_delay)
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def bench(mode, clients, seconds, projects, client_delay, warmup):
+    from asgi import DevPairASGI
+    from app import create_app
+
+    application = DevPairASGI(create_app('bench'), async_reads=mode == 'async')
+
+    async def measure():
+        # Fill the connection pools and statement caches before timing
+        await run_clients(application, clients, warmup, projects, client_delay)
+        return await run_clients(application, clients, seconds, projects, client_delay)
+
+    latencies, errors, elapsed = asyncio.run(measure())
+    latencies.sort()
+    return {
+        'mode': mode,
+        'clients': clients,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 100, 400])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--warmup', type=float, default=2, help='Unmeasured seconds before each run.')
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=32)
+    parser.add_argument('--db-latency-ms', type=float, default=10)
+    parser.add_argument('--client-delay-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    DB_LATENCY = args.db_latency_ms / 1000
+    path = os.path.join(tempfile.mkdtemp(prefix='devpair-bench-'), 'bench.db')
+    prepare(path, 'production', args.projects)
+    add_children(path, args.projects)
+    config['bench'] = bench_config(path, args.threads, args.pool_size)
+
+    print(f'threads={args.threads} pool_size={args.pool_size} db_latency={args.db_latency_ms}ms '
+          f'client_delay={args.client_delay_ms}ms')
+    print(f'{"mode":<6} {"clients":>7} {"requests":>9} {"errors":>6} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8}')
+    for clients in args.clients:
+        for mode in ('sync', 'async'):
+            result = bench(mode, clients, args.seconds, args.projects, args.client_delay_ms / 1000, args.warmup)
+            print(f'{result["mode"]:<6} {result["clients"]:>7} {result["requests"]:>9} {result["errors"]:>6} '
+                  f'{result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} {result["p99_ms"]:>8.1f}')
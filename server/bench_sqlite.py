@@ -0,0 +1,109 @@
+"""Concurrent read/write throughput of the default vs production SQLite profile.
+
+Each worker process opens its own engine, as a gunicorn worker would, and runs
+a mix of project listings and comment inserts for a fixed duration.
+
+    python bench_sqlite.py --workers 8 --seconds 10 --write-ratio 0.2
+"""
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.exc import OperationalError
+from multiprocessing import Pool
+from datetime import datetime
+from models import db, User, Project, Comment
+from database import apply_sqlite_pragmas, check_engine_settings
+from config import ProductionConfig
+import argparse
+import os
+import random
+import tempfile
+import time
+
+PROFILES = {
+    'default': ({}, {}),
+    'production': (ProductionConfig.SQLITE_PRAGMAS, ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS),
+}
+
+
+def make_engine(path, profile):
+    pragmas, options = PROFILES[profile]
+    engine = create_engine(f'sqlite:///{path}', **options)
+    if pragmas:
+        event.listen(engine, 'connect', lambda conn, record: apply_sqlite_pragmas(conn, pragmas))
+    return engine
+
+
+def prepare(path, profile, projects=200):
+    engine = make_engine(path, profile)
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{
+            'username': 'bench', 'username_key': 'bench', 'email': 'bench@example.com', 'full_name': 'Bench',
+            'password_hash': 'x', 'experience_level': 'beginner', 'profile_version': 1
+        }])
+        connection.execute(insert(Project), [{
+            'title': f'Project {i}', 'description': 'Benchmark project ' * 20,
+            'difficulty_level': 'beginner', 'status': 'ongoing', 'is_public': True,
+            'owner_id': 1, 'created_at': datetime.utcnow()
+        } for i in range(projects)])
+    if PROFILES[profile][0]:
+        check_engine_settings(engine, PROFILES[profile][0])
+    engine.dispose()
+
+
+def worker(args):
+    path, profile, seconds, write_ratio, seed = args
+    rng = random.Random(seed)
+    engine = make_engine(path, profile)
+    reads = writes = locked = 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as connection:
+                    connection.execute(insert(Comment).values(
+                        content='benchmark comment', author_id=1,
+                        project_id=rng.randint(1, 200), created_at=datetime.utcnow()
+                    ))
+                writes += 1
+            else:
+                with engine.connect() as connection:
+                    connection.execute(
+                        select(Project).where(Project.is_public == True)
+                        .order_by(Project.created_at.desc()).limit(10)
+                    ).all()
+                reads += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+
+    engine.dispose()
+    return reads, writes, locked
+
+
+def run(profile, workers, seconds, write_ratio):
+    directory = tempfile.mkdtemp(prefix='devpair-bench-')
+    path = os.path.join(directory, 'bench.db')
+    prepare(path, profile)
+
+    with Pool(workers) as pool:
+        results = pool.map(worker, [(path, profile, seconds, write_ratio, i) for i in range(workers)])
+
+    reads, writes, locked = (sum(column) for column in zip(*results))
+    print(
+        f'{profile:>10}: {reads / seconds:9.0f} reads/s {writes / seconds:8.0f} writes/s '
+        f'{locked:6d} "database is locked" errors'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append')
+    args = parser.parse_args()
+
+    for profile in args.profile or ['default', 'production']:
+        run(profile, args.workers, args.seconds, args.write_ratio)
@@ -0,0 +1,185 @@
+from flask import g, has_request_context
+from sqlalchemy import delete, func, insert, select
+from models import db, ChangeLog, Watermark, Project, PairingRequest, ProjectCollaborator, Milestone, Comment
+from fieldsets import Fieldset
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+ENTITY_MODELS = {
+    'project': Project,
+    'milestone': Milestone,
+    'comment': Comment,
+    'pairing_request': PairingRequest,
+    'collaborator': ProjectCollaborator,
+}
+
+# Changes older than this watermark may have been compacted away
+HORIZON = 'change_log_horizon'
+
+# Columns of the entry's project that decide visibility (all None once purged)
+ProjectScope = namedtuple('ProjectScope', ['id', 'owner_id', 'is_public', 'deleted_at'])
+
+
+class ResyncRequired(Exception):
+    pass
+
+
+def change(entity_type, entity_id, project_id, op='upsert', user_id=None):
+    return {
+        'entity_type': entity_type,
+        'entity_id': entity_id,
+        'project_id': project_id,
+        'op': op,
+        'user_id': user_id,
+        'owner_id': None,
+        'is_public': None,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def record_changes(*changes):
+    """Append change-log rows in the caller's transaction; the caller commits."""
+    if changes:
+        # Deletions outlive their project, so they keep a copy of its scope
+        project_ids = {entry['project_id'] for entry in changes if entry['op'] == 'delete' and entry['project_id']}
+        if project_ids:
+            scopes = {row.id: row for row in db.session.execute(
+                select(Project.id, Project.owner_id, Project.is_public).where(Project.id.in_(project_ids))
+            )}
+            for entry in changes:
+                scope = scopes.get(entry['project_id']) if entry['op'] == 'delete' else None
+                if scope is not None:
+                    entry['owner_id'], entry['is_public'] = scope.owner_id, scope.is_public
+        db.session.execute(insert(ChangeLog), list(changes))
+        if has_request_context():
+            g.changes_recorded = True
+
+
+def latest_seq():
+    return db.session.scalar(select(func.max(ChangeLog.seq))) or 0
+
+
+def changed_project_ids(since, until):
+    """Projects touched by any change in (since, until]."""
+    return set(db.session.scalars(
+        select(ChangeLog.project_id).distinct()
+        .where(ChangeLog.seq > since, ChangeLog.seq <= until, ChangeLog.project_id.isnot(None))
+    ))
+
+
+def get_horizon():
+    watermark = db.session.get(Watermark, HORIZON)
+    return int(watermark.value) if watermark else 0
+
+
+def _snapshot(entry):
+    return ProjectScope(entry.project_id, entry.owner_id, entry.is_public, None)
+
+
+def _visible(entry, project, user_id, member_of):
+    if project.id is None:
+        # Purged project: only deletions are left to report, to whoever could see the project
+        if entry.op != 'delete':
+            return False
+        project = _snapshot(entry)
+    if user_id is not None and project.owner_id == user_id:
+        return True
+    if entry.entity_type == 'pairing_request':
+        return user_id is not None and entry.user_id == user_id
+    return project.is_public or project.id in member_of
+
+
+def changes_since(since, user_id=None, limit=500):
+    """Latest change per entity after seq `since` that the user may see, with current data."""
+    # A client starting from 0 holds nothing that an expired deletion could affect
+    if 0 < since < get_horizon():
+        raise ResyncRequired()
+
+    rows = db.session.execute(
+        select(ChangeLog, *[getattr(Project, field) for field in ProjectScope._fields])
+        .outerjoin(Project, Project.id == ChangeLog.project_id)
+        .where(ChangeLog.seq > since)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    member_of = set()
+    if user_id is not None:
+        member_of = set(db.session.scalars(
+            select(ProjectCollaborator.project_id).where(ProjectCollaborator.user_id == user_id)
+        ))
+
+    latest = {}
+    for entry, *project in rows:
+        project = ProjectScope(*project)
+        if _visible(entry, project, user_id, member_of):
+            deleted = entry.op == 'delete' or project.deleted_at is not None
+        elif entry.is_public is not None and _visible(entry, _snapshot(entry), user_id, member_of):
+            # This change hid the entity from a caller who could see it before
+            deleted = True
+        else:
+            continue
+        latest.pop((entry.entity_type, entry.entity_id), None)
+        latest[(entry.entity_type, entry.entity_id)] = (entry.seq, 'delete' if deleted else entry.op)
+
+    # One query per entity type for the current state of every upserted entity
+    current = {}
+    for entity_type, model in ENTITY_MODELS.items():
+        ids = [entity_id for (kind, entity_id), (_, op) in latest.items() if kind == entity_type and op == 'upsert']
+        if ids:
+            fieldset = Fieldset.columns(model)
+            for obj in model.query.options(*fieldset.options()).filter(model.id.in_(ids)):
+                current[(entity_type, obj.id)] = fieldset.serialize(obj)
+
+    changes = []
+    for (entity_type, entity_id), (seq, op) in latest.items():
+        data = current.get((entity_type, entity_id))
+        changes.append({
+            'seq': seq,
+            'type': entity_type,
+            'id': entity_id,
+            'op': op if data is not None else 'delete',
+            'data': data,
+        })
+
+    return {
+        'changes': changes,
+        'next_since': rows[-1][0].seq if rows else since,
+        'has_more': has_more,
+    }
+
+
+def compact_change_log(retention_days=30):
+    """Drop superseded entries, then expire old deletions behind a resync horizon."""
+    latest = select(func.max(ChangeLog.seq)).group_by(ChangeLog.entity_type, ChangeLog.entity_id)
+    superseded = db.session.execute(
+        delete(ChangeLog).where(ChangeLog.seq.not_in(latest)).execution_options(synchronize_session=False)
+    ).rowcount
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    horizon = db.session.scalar(
+        select(func.max(ChangeLog.seq)).where(ChangeLog.op == 'delete', ChangeLog.created_at < cutoff)
+    )
+    expired = 0
+    if horizon is not None:
+        expired = db.session.execute(
+            delete(ChangeLog)
+            .where(ChangeLog.op == 'delete', ChangeLog.seq <= horizon)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        watermark = db.session.get(Watermark, HORIZON) or Watermark(name=HORIZON, value='0')
+        watermark.value = str(max(horizon, int(watermark.value)))
+        db.session.add(watermark)
+
+    db.session.commit()
+    return superseded, expired
+
+
+def init_changelog(app):
+    @app.cli.command('compact-changes')
+    def compact_changes_command():
+        """Compact the change log used by /api/sync."""
+        superseded, expired = compact_change_log(app.config['CHANGE_LOG_RETENTION_DAYS'])
+        print(f'Removed {superseded} superseded and {expired} expired change(s)')
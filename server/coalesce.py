@@ -0,0 +1,126 @@
+from flask import current_app, request
+from identity import request_identity
+from routing import READ_METHODS
+from functools import wraps
+from threading import Event, Lock
+
+
+class _Flight:
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = Event()
+        self.result = None  # (body, status, headers) once shareable
+        self.waiters = 0
+
+
+class CoalesceStats:
+    def __init__(self):
+        self.requests = 0
+        self.leaders = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+        self.max_waiters = 0
+        self._lock = Lock()
+
+    def record(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'fallbacks': self.fallbacks,
+            'max_waiters': self.max_waiters,
+            'coalesce_rate': round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+class SingleFlight:
+    """Let concurrent identical GETs share one run of the view.
+
+    The first request for a key runs the view; requests arriving while it is
+    in flight wait and get a copy of its 200 response body. Keys include the
+    caller's identity unless a route is marked public, so a response is only
+    shared between callers who would get the same one. Failures and non-200
+    responses are never shared: waiters then run the view themselves.
+    """
+
+    def __init__(self, app):
+        self.enabled = app.config.get('COALESCE_GETS', True)
+        self.wait_seconds = app.config.get('COALESCE_WAIT_SECONDS', 10)
+        self.stats = CoalesceStats()
+        self._flights = {}
+        self._lock = Lock()
+        # Bumped after every successful write in this process; a flight started
+        # before a write may have read older data, so later requests never join it
+        self._generation = 0
+
+    def wrote(self):
+        with self._lock:
+            self._generation += 1
+
+    def __call__(self, view=None, public=False):
+        """Decorator: @single_flight or @single_flight(public=True) for caller-independent routes."""
+        if view is None:
+            return lambda view: self(view, public)
+
+        @wraps(view)
+        def coalesced_view(*args, **kwargs):
+            if not self.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (
+                request.endpoint,
+                tuple(sorted(request.view_args.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                None if public else request_identity(),
+            )
+            return self._run(key, lambda: view(*args, **kwargs))
+
+        return coalesced_view
+
+    def _run(self, key, compute):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None or flight.generation != self._generation
+            if leader:
+                flight = _Flight(self._generation)
+                self._flights[key] = flight
+            else:
+                flight.waiters += 1
+                self.stats.max_waiters = max(self.stats.max_waiters, flight.waiters)
+
+        if not leader:
+            if flight.done.wait(self.wait_seconds) and flight.result is not None:
+                self.stats.record(requests=1, coalesced=1)
+                body, status, headers = flight.result
+                return current_app.response_class(body, status=status, headers=headers)
+            self.stats.record(requests=1, fallbacks=1)
+            return compute()
+
+        self.stats.record(requests=1, leaders=1)
+        try:
+            response = current_app.make_response(compute())
+            if response.status_code == 200 and not response.is_streamed:
+                flight.result = (response.get_data(), response.status_code, list(response.headers))
+            return response
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+
+def init_single_flight(app):
+    single_flight = SingleFlight(app)
+    app.extensions['single_flight'] = single_flight
+
+    @app.after_request
+    def end_write_generation(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            single_flight.wrote()
+        return response
+
+    return single_flight
@@ -0,0 +1,169 @@
+from flask import request
+from collections import OrderedDict
+from threading import Lock
+import gzip
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+
+class CompressionStats:
+    def __init__(self):
+        self.responses = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self._lock = Lock()
+
+    def record(self, bytes_in, bytes_out, cpu_seconds, cache_hit=False):
+        with self._lock:
+            self.responses += 1
+            self.cache_hits += cache_hit
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+
+    def to_dict(self):
+        return {
+            'responses': self.responses,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'bytes_saved': self.bytes_in - self.bytes_out,
+            'cpu_ms': round(self.cpu_seconds * 1000, 3),
+        }
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (etag, encoding)."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if not self.size:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level, stats):
+    # Flush after every chunk so streamed responses stay incremental
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=min(level, 11))
+        step = lambda chunk: compressor.process(chunk) + compressor.flush()
+        finish = compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        step = lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+
+    bytes_in = bytes_out = 0
+    cpu = 0.0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        started = time.thread_time()
+        out = step(chunk)
+        cpu += time.thread_time() - started
+        bytes_in += len(chunk)
+        bytes_out += len(out)
+        if out:
+            yield out
+
+    tail = finish()
+    stats.record(bytes_in, bytes_out + len(tail), cpu)
+    yield tail
+
+
+def init_compression(app):
+    """Negotiate gzip/brotli for large responses, caching compressed bodies of GETs by ETag."""
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+    stream = app.config.get('COMPRESS_STREAMS', True)
+    cache = CompressedBodyCache(app.config.get('COMPRESS_CACHE_SIZE', 256))
+    stats = CompressionStats()
+    app.extensions['compression'] = stats
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            if not stream:
+                return response
+            response.response = compress_stream(response.response, encoding, level, stats)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            response.direct_passthrough = False
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        cacheable = request.method == 'GET' and response.status_code == 200
+        if cacheable:
+            if not response.get_etag()[0]:
+                response.add_etag()
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        etag = response.get_etag()[0]
+        key = (etag, encoding)
+        started = time.thread_time()
+        body = cache.get(key) if cacheable else None
+        hit = body is not None
+        if not hit:
+            body = compress(data, encoding, level)
+            if cacheable:
+                cache.put(key, body)
+        cpu = time.thread_time() - started
+        stats.record(len(data), len(body), cpu, cache_hit=hit)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            # The compressed variant is only semantically equal to the identity body
+            response.set_etag(etag, weak=True)
+        response.headers.add('Server-Timing', f'compress;dur={cpu * 1000:.3f}')
+        return response
+
+    return stats
@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from sqlalchemy.pool import QueuePool
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -8,12 +9,102 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Seconds to cache project roles across requests (0 = per-request only)
+    AUTHZ_CACHE_TTL = int(os.environ.get('AUTHZ_CACHE_TTL', 0))
+    # Seconds a cached /auth/me payload may be served without re-reading the user
+    PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', 300))
+    # Read replicas for GET requests (comma-separated URLs); empty = primary only
+    DB_REPLICA_URLS = [url for url in os.environ.get('DB_REPLICA_URLS', '').split(',') if url]
+    # Seconds a client's reads stay on the primary after it writes
+    DB_READ_STICKY_SECONDS = int(os.environ.get('DB_READ_STICKY_SECONDS', 5))
+    # Seconds between copies of the local SQLite replication stand-in (0 = off)
+    DB_REPLICA_SYNC_INTERVAL = int(os.environ.get('DB_REPLICA_SYNC_INTERVAL', 0))
+    # GETs issued by serve.py's warm-up before a worker accepts traffic
+    WARMUP_PATHS = ['/api/projects']
+    # Largest batch accepted by the bulk milestone endpoints
+    MAX_BULK_ITEMS = 100
+    # Deleting a project hides it at once and purges its rows in a background thread;
+    # False purges synchronously in the request
+    PROJECT_SOFT_DELETE = os.environ.get('PROJECT_SOFT_DELETE', 'true').lower() == 'true'
+    PURGE_CHUNK_SIZE = 500
+    # Deletions older than this are compacted out of the /api/sync change log
+    CHANGE_LOG_RETENTION_DAYS = 30
+    # Pre-serialized head of the unfiltered public project listing (0 = off);
+    # rebuilt in full every PUBLIC_FEED_TTL seconds, optionally persisted to a JSON file
+    PUBLIC_FEED_SIZE = 100
+    PUBLIC_FEED_TTL = 300
+    PUBLIC_FEED_PATH = os.environ.get('PUBLIC_FEED_PATH')
+    # Milestone due-date reminders: seconds between in-process runs (0 = only via
+    # `flask send-reminders`), how far ahead a milestone counts as coming due, and
+    # how far back the very first run looks for overdue ones
+    MILESTONE_REMINDER_INTERVAL = int(os.environ.get('MILESTONE_REMINDER_INTERVAL', 0))
+    MILESTONE_REMINDER_LEAD_HOURS = 24
+    MILESTONE_REMINDER_LOOKBACK_HOURS = 24
+    MILESTONE_REMINDER_BATCH = 500
+    # Concurrent identical GETs on coalesced routes share one run of the view;
+    # waiters give up and run it themselves after COALESCE_WAIT_SECONDS
+    COALESCE_GETS = True
+    COALESCE_WAIT_SECONDS = 10
+    # asgi.py: threads for the WSGI path, and the GET endpoints served on an
+    # async engine (ASYNC_DATABASE_URL, else DATABASE_URL with an async driver)
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 8))
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')
+    ASYNC_READ_ENDPOINTS = [
+        'get_projects', 'get_project', 'get_project_milestones', 'get_project_comments', 'get_notifications',
+    ]
+    # Response compression (gzip, plus brotli when the package is installed)
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    COMPRESS_STREAMS = True
+    COMPRESS_CACHE_SIZE = 256  # compressed GET bodies kept per process, keyed by ETag
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted
+    # (werkzeug ProxyFix); 0 = take the client address from the socket
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+    # Token buckets per view endpoint ('*' = shared by all routes); scopes are
+    # 'ip', 'user' (authenticated requests only) and 'route' (all callers).
+    # Behind a proxy, 'ip' limits need TRUSTED_PROXIES or every client shares one bucket
+    RATE_LIMITS = {
+        '*': {'ip': '600/minute'},
+        'login': {'ip': '10/minute', 'route': '20/second'},
+        'register': {'ip': '5/minute'},
+        'get_projects': {'ip': '120/minute', 'route': '200/second'},
+        'create_pairing_request': {'user': '10/minute', 'ip': '30/minute'},
+    }
+    # 'memory' or 'module:Class' implementing ratelimit.RateLimitBackend
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')
+    # In-flight request caps per process; excess requests get 503 + Retry-After
+    MAX_CONCURRENT_REQUESTS = int(os.environ.get('MAX_CONCURRENT_REQUESTS', 64))
+    ROUTE_CONCURRENCY = {
+        'login': 4,
+        'register': 4,
+        'get_projects': 16,
+        'create_pairing_request': 8,
+    }
     
 class DevelopmentConfig(Config):
     DEBUG = True
     
 class ProductionConfig(Config):
     DEBUG = False
+    
+    # Applied on every new SQLite connection (see database.configure_engine)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # negative = KiB, i.e. ~64MB per connection
+        'foreign_keys': 'ON',
+    }
+    SQLITE_STARTUP_CHECK = True
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': QueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,88 @@
+import logging
+from sqlalchemy import event
+from models import db
+from routing import init_read_replicas
+
+logger = logging.getLogger(__name__)
+
+# PRAGMA values SQLite reports back as integers
+_PRAGMA_ALIASES = {
+    'synchronous': {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3},
+    'foreign_keys': {'OFF': 0, 'ON': 1},
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+
+def read_sqlite_pragmas(connection, names):
+    return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
+
+
+def _expected(name, value):
+    value = _PRAGMA_ALIASES.get(name, {}).get(str(value).upper(), value)
+    return str(value).lower()
+
+
+def check_engine_settings(engine, pragmas, log=logger):
+    """Log the effective pragmas and pool settings, warning about any that did not take."""
+    with engine.connect() as connection:
+        effective = read_sqlite_pragmas(connection, pragmas)
+
+    for name, value in pragmas.items():
+        if str(effective[name]).lower() != _expected(name, value):
+            log.warning('SQLite pragma %s=%s requested but %s is in effect', name, value, effective[name])
+
+    log.info(
+        'SQLite engine %s: %s; pool %s',
+        engine.url.database,
+        ', '.join(f'{name}={value}' for name, value in effective.items()),
+        engine.pool.status()
+    )
+    return effective
+
+
+def install_sqlite_pragmas(app, engine):
+    """Apply SQLITE_PRAGMAS to every new connection of a SQLite engine."""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    if app.config.get('SQLITE_STARTUP_CHECK'):
+        check_engine_settings(engine, pragmas, app.logger)
+
+
+def configure_engine(app):
+    """Install the SQLite pragmas on the app's engines and attach any read replicas."""
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    for engine in engines:
+        install_sqlite_pragmas(app, engine)
+
+    init_read_replicas(app, on_engine=lambda engine: install_sqlite_pragmas(app, engine))
+
+
+def app_engines(app):
+    """Every engine the app holds: the primary binds plus any read replicas."""
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    replicas = app.extensions.get('db_replicas')
+    if replicas is not None:
+        engines.extend(replicas.engines)
+    return engines
+
+
+def dispose_engines(app, close=True):
+    """Empty the engines' pools; close=False after fork leaves the parent's connections alone."""
+    for engine in app_engines(app):
+        engine.dispose(close=close)
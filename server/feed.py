@@ -0,0 +1,150 @@
+from flask import g
+from models import db, Project
+from changelog import changed_project_ids, latest_seq
+from collections import namedtuple
+from datetime import datetime
+from math import ceil
+from threading import Lock
+import json
+import os
+import time
+
+# entries: [(sort key, serialized project)] newest first; total: all public projects
+FeedState = namedtuple('FeedState', ['seq', 'built_at', 'total', 'entries'])
+
+
+def _sort_key(project):
+    created_at = (project.created_at or datetime.min).strftime('%Y-%m-%dT%H:%M:%S.%f')
+    return [created_at, project.id]
+
+
+def _public_projects():
+    return Project.query.filter_by(is_public=True, deleted_at=None)
+
+
+class PublicProjectFeed:
+    """Pre-serialized first PUBLIC_FEED_SIZE projects of the unfiltered GET /api/projects.
+
+    Kept current from the change log: a check costs one max(seq) query and only
+    projects touched since the last check are serialized again. A full rebuild
+    every PUBLIC_FEED_TTL seconds picks up what the log does not record, such
+    as an owner editing their profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.size = app.config.get('PUBLIC_FEED_SIZE', 100)
+        self.ttl = app.config.get('PUBLIC_FEED_TTL', 300)
+        self.path = app.config.get('PUBLIC_FEED_PATH')
+        self._state = self._load() if self.path else None
+        self._lock = Lock()
+
+    def page(self, page, per_page):
+        """Response body for one page of the default listing, or None to query instead."""
+        if not self.size or page < 1 or per_page < 1:
+            return None
+        return self._page(self.refresh(), page, per_page)
+
+    def is_current(self, seq):
+        state = self._state
+        return state is not None and state.seq >= seq and time.time() - state.built_at < self.ttl
+
+    def cached_page(self, page, per_page, seq):
+        """Like page() but never touches the database: None unless the feed is current as of seq."""
+        if not self.size or page < 1 or per_page < 1 or not self.is_current(seq):
+            return None
+        return self._page(self._state, page, per_page)
+
+    def _page(self, state, page, per_page):
+        start = (page - 1) * per_page
+        if start + per_page > len(state.entries) and len(state.entries) < state.total:
+            return None
+        return {
+            'projects': [payload for _, payload in state.entries[start:start + per_page]],
+            'total': state.total,
+            'pages': ceil(state.total / per_page) if state.total else 0,
+            'current_page': page,
+        }
+
+    def refresh(self):
+        state = self._state
+        if state is not None and time.time() - state.built_at < self.ttl:
+            seq = latest_seq()
+            if seq <= state.seq:
+                return state
+        with self._lock:
+            state = self._state
+            if state is None or time.time() - state.built_at >= self.ttl:
+                state = self._rebuild()
+            else:
+                seq = latest_seq()
+                if seq > state.seq:
+                    state = self._patch(state, seq)
+            return state
+
+    def _rebuild(self):
+        # Read the seq first so changes racing the rebuild are patched in later
+        seq = latest_seq()
+        projects = _public_projects().order_by(Project.created_at.desc(), Project.id.desc()).limit(self.size).all()
+        total = len(projects) if len(projects) < self.size else _public_projects().count()
+        return self._set(FeedState(seq, time.time(), total, [
+            (_sort_key(project), project.to_dict()) for project in projects
+        ]))
+
+    def _patch(self, state, seq):
+        project_ids = changed_project_ids(state.seq, seq)
+        if not project_ids:
+            return self._set(state._replace(seq=seq))
+
+        # A full feed is only the head of the listing; projects sorting after its
+        # last entry stay out
+        last_key = state.entries[-1][0] if len(state.entries) >= self.size else None
+        entries = [entry for entry in state.entries if entry[1]['id'] not in project_ids]
+        for project in _public_projects().filter(Project.id.in_(project_ids)):
+            key = _sort_key(project)
+            if last_key is None or key >= last_key:
+                entries.append((key, project.to_dict()))
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+
+        total = _public_projects().count()
+        if len(entries) < min(self.size, total):
+            # Removals left a gap only the database can fill
+            return self._rebuild()
+        return self._set(FeedState(seq, state.built_at, total, entries[:self.size]))
+
+    def _set(self, state):
+        self._state = state
+        if self.path:
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(state._asdict(), f)
+            os.replace(tmp_path, self.path)
+        return state
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return FeedState(data['seq'], data['built_at'], data['total'],
+                             [tuple(entry) for entry in data['entries']])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def init_feed(app):
+    feed = PublicProjectFeed(app)
+    app.extensions['public_feed'] = feed
+
+    if feed.size:
+        @app.after_request
+        def refresh_public_feed(response):
+            # Patch right after a write so the next reader finds the feed current
+            if g.get('changes_recorded') and response.status_code < 400:
+                try:
+                    feed.refresh()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning('Refreshing the public project feed failed: %s', e)
+            return response
+
+    return feed
@@ -0,0 +1,166 @@
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+# Attributes that can never be requested through ?fields= or ?include=
+PRIVATE_ATTRIBUTES = {
+    'users': {'password_hash', 'username_key', 'notifications'},
+    'projects': {'deleted_at'},
+    'milestones': {'reminded_due_date'},
+}
+
+MAX_INCLUDE_DEPTH = 2
+
+# Levels of the default to_dict() graph loaded up front; deeper ones load lazily
+SERIALIZED_LOAD_DEPTH = 3
+
+
+class FieldsetError(ValueError):
+    pass
+
+
+class _Node:
+    """Requested columns and included relationships for one model in the tree."""
+
+    def __init__(self, model):
+        self.model = model
+        self.mapper = inspect(model)
+        private = PRIVATE_ATTRIBUTES.get(self.mapper.local_table.name, set())
+        self.public_columns = [
+            column.key for column in self.mapper.column_attrs if column.key not in private
+        ]
+        self.public_relationships = {
+            rel.key: rel for rel in self.mapper.relationships if rel.key not in private
+        }
+        self.columns = None  # None = every public column
+        self.children = {}
+
+    def child(self, name, path):
+        if name not in self.public_relationships:
+            raise FieldsetError(f'Unknown relationship "{path}" for {self.model.__name__}')
+        if name not in self.children:
+            self.children[name] = _Node(self.public_relationships[name].mapper.class_)
+        return self.children[name]
+
+    def add_column(self, name, path):
+        if name not in self.public_columns:
+            raise FieldsetError(f'Unknown field "{path}" for {self.model.__name__}')
+        if self.columns is None:
+            self.columns = []
+        if name not in self.columns:
+            self.columns.append(name)
+
+    def selected_columns(self):
+        return self.columns if self.columns is not None else self.public_columns
+
+    def loaded_columns(self):
+        # Keys are always loaded so included relationships can be joined back
+        keys = [column.key for column in self.mapper.column_attrs
+                if column.columns[0].primary_key or column.columns[0].foreign_keys]
+        return [getattr(self.model, name) for name in dict.fromkeys(keys + self.selected_columns())]
+
+    def loader_options(self):
+        options = []
+        for name, child in self.children.items():
+            options.append(
+                selectinload(getattr(self.model, name)).options(
+                    load_only(*child.loaded_columns()), *child.loader_options()
+                )
+            )
+        return options
+
+    def serialize(self, obj):
+        data = obj.to_dict(only=tuple(self.selected_columns()))
+        for name, child in self.children.items():
+            value = getattr(obj, name)
+            if value is None:
+                data[name] = None
+            elif self.public_relationships[name].uselist:
+                data[name] = [child.serialize(item) for item in value]
+            else:
+                data[name] = child.serialize(value)
+        return data
+
+
+class Fieldset:
+    """Parsed ?fields= and ?include= for a model.
+
+    fields: comma-separated columns; dotted names select columns of an included
+    relationship (owner.username). include: comma-separated relationships,
+    dotted for nesting (collaborators.user). Without either parameter the model's
+    regular to_dict() output is kept.
+    """
+
+    def __init__(self, model, fields='', include=''):
+        self.root = _Node(model)
+        self.sparse = bool(fields or include)
+
+        for path in _split(include):
+            names = path.split('.')
+            if len(names) > MAX_INCLUDE_DEPTH:
+                raise FieldsetError(f'Include "{path}" is nested deeper than {MAX_INCLUDE_DEPTH} levels')
+            node = self.root
+            for name in names:
+                node = node.child(name, path)
+
+        for path in _split(fields):
+            *relationships, column = path.split('.')
+            node = self.root
+            for name in relationships:
+                if name not in node.children:
+                    raise FieldsetError(f'Field "{path}" needs include={".".join(relationships)}')
+                node = node.children[name]
+            node.add_column(column, path)
+
+    @classmethod
+    def from_request(cls, model):
+        return cls(model, request.args.get('fields', ''), request.args.get('include', ''))
+
+    @classmethod
+    def columns(cls, model):
+        """Every public column of the model and no relationships."""
+        fieldset = cls(model)
+        fieldset.sparse = True
+        return fieldset
+
+    def restrict(self, columns):
+        """Limit the root to `columns`, for routes exposing only part of the model."""
+        node = self.root
+        if node.columns is None:
+            node.columns = [name for name in node.public_columns if name in columns]
+        for name in node.columns:
+            if name not in columns:
+                raise FieldsetError(f'Unknown field "{name}" for {node.model.__name__}')
+        return self
+
+    def options(self):
+        """Loader options for what serialize() emits: the requested fields, or the to_dict() graph."""
+        if not self.sparse:
+            return _serialized_loads(self.root.model, SERIALIZED_LOAD_DEPTH)
+        return [load_only(*self.root.loaded_columns()), *self.root.loader_options()]
+
+    def serialize(self, obj):
+        if not self.sparse:
+            return obj.to_dict()
+        return self.root.serialize(obj)
+
+
+def _serialized_loads(model, depth, excluded=()):
+    """selectinload options for the relationships model.to_dict() emits, following serialize_rules."""
+    rules = getattr(model, 'serialize_rules', ())
+    options = []
+    for rel in inspect(model).relationships:
+        if f'-{rel.key}' in rules or rel.key in excluded:
+            continue
+        # Many-to-one joins into the parent query; collections take one query each
+        loader = (selectinload if rel.uselist else joinedload)(getattr(model, rel.key))
+        if depth > 1:
+            # '-owner.owned_projects' on this model drops owned_projects one level down
+            nested = {rule[len(rel.key) + 2:] for rule in rules if rule.startswith(f'-{rel.key}.')}
+            loader = loader.options(*_serialized_loads(rel.mapper.class_, depth - 1, nested))
+        options.append(loader)
+    return options
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
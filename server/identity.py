@@ -0,0 +1,13 @@
+from flask import g
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+def request_identity():
+    """The caller's JWT identity, or None for anonymous or invalid tokens; decoded once per request."""
+    if 'request_identity' not in g:
+        try:
+            verify_jwt_in_request(optional=True)
+            g.request_identity = get_jwt_identity()
+        except Exception:
+            g.request_identity = None
+    return g.request_identity
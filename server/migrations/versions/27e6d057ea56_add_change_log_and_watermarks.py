@@ -0,0 +1,59 @@
+"""add change_log and watermarks
+
+Revision ID: 27e6d057ea56
+Revises: 3614be582d92
+Create Date: 2026-10-19 11:53:05.272920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '27e6d057ea56'
+down_revision = '3614be582d92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    if 'change_log' not in existing:
+        op.create_table('change_log',
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(length=10), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('seq')
+        )
+        op.create_index('ix_change_log_entity', 'change_log', ['entity_type', 'entity_id'], unique=False)
+        op.create_index(op.f('ix_change_log_project_id'), 'change_log', ['project_id'], unique=False)
+    else:
+        # Tables created with db.create_all() before the deletion snapshot columns
+        columns = {column['name'] for column in inspector.get_columns('change_log')}
+        if 'owner_id' not in columns:
+            op.add_column('change_log', sa.Column('owner_id', sa.Integer(), nullable=True))
+        if 'is_public' not in columns:
+            op.add_column('change_log', sa.Column('is_public', sa.Boolean(), nullable=True))
+
+    if 'watermarks' not in existing:
+        op.create_table('watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade():
+    op.drop_table('watermarks')
+    op.drop_index(op.f('ix_change_log_project_id'), table_name='change_log')
+    op.drop_index('ix_change_log_entity', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,139 @@
+"""baseline schema
+
+Revision ID: 2b7298214b4f
+Revises:
+Create Date: 2026-10-19 11:51:49.300530
+
+Databases created before migrations existed (db.create_all(), seed.py)
+already have these tables, so only missing ones are created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7298214b4f'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('full_name', sa.String(length=100), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('bio', sa.Text(), nullable=True),
+        sa.Column('github_url', sa.String(length=200), nullable=True),
+        sa.Column('linkedin_url', sa.String(length=200), nullable=True),
+        sa.Column('portfolio_url', sa.String(length=200), nullable=True),
+        sa.Column('skills', sa.Text(), nullable=True),
+        sa.Column('experience_level', sa.String(length=20), nullable=False),
+        sa.Column('avatar_url', sa.String(length=200), nullable=True),
+        sa.Column('is_available', sa.Boolean(), nullable=True),
+        sa.Column('dark_mode', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+        )
+    if 'notifications' not in existing:
+        op.create_table('notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_notifications_user_id_users')),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'projects' not in existing:
+        op.create_table('projects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('tech_stack', sa.Text(), nullable=True),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column('difficulty_level', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('repository_url', sa.String(length=200), nullable=True),
+        sa.Column('demo_url', sa.String(length=200), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('max_collaborators', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], name=op.f('fk_projects_owner_id_users')),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'comments' not in existing:
+        op.create_table('comments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('is_edited', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], name=op.f('fk_comments_author_id_users')),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_comments_project_id_projects')),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'milestones' not in existing:
+        op.create_table('milestones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_milestones_project_id_projects')),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'pairing_requests' not in existing:
+        op.create_table('pairing_requests',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('response_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('requester_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_pairing_requests_project_id_projects')),
+        sa.ForeignKeyConstraint(['requester_id'], ['users.id'], name=op.f('fk_pairing_requests_requester_id_users')),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'project_collaborators' not in existing:
+        op.create_table('project_collaborators',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=20), nullable=True),
+        sa.Column('joined_at', sa.DateTime(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name=op.f('fk_project_collaborators_project_id_projects')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_project_collaborators_user_id_users')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'project_id', name='unique_user_project_collaboration')
+        )
+
+
+def downgrade():
+    op.drop_table('project_collaborators')
+    op.drop_table('pairing_requests')
+    op.drop_table('milestones')
+    op.drop_table('comments')
+    op.drop_table('projects')
+    op.drop_table('notifications')
+    op.drop_table('users')
@@ -0,0 +1,30 @@
+"""add projects.deleted_at
+
+Revision ID: 3614be582d92
+Revises: 8d005c9d9936
+Create Date: 2026-10-19 11:52:33.590508
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3614be582d92'
+down_revision = '8d005c9d9936'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'deleted_at' not in {column['name'] for column in inspector.get_columns('projects')}:
+        op.add_column('projects', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    if 'ix_projects_deleted_at' not in {index['name'] for index in inspector.get_indexes('projects')}:
+        op.create_index(op.f('ix_projects_deleted_at'), 'projects', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_projects_deleted_at'), table_name='projects')
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,57 @@
+"""add users.username_key
+
+Revision ID: 821e4c5c37c7
+Revises: 857f502ddffe
+Create Date: 2026-10-19 11:55:06.700393
+
+Usernames become unique ignoring case (Unicode case folding, not SQL lower(),
+which only folds ASCII on SQLite). Existing usernames that fold to the same
+key stop the upgrade; rename one of each pair and run it again.
+"""
+from alembic import op
+import sqlalchemy as sa
+import unicodedata
+
+
+# revision identifiers, used by Alembic.
+revision = '821e4c5c37c7'
+down_revision = '857f502ddffe'
+branch_labels = None
+depends_on = None
+
+
+def username_key(username):
+    # Same folding as models.username_key, copied so this revision never changes
+    return unicodedata.normalize('NFKC', username).casefold()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('username', sa.String),
+                     sa.column('username_key', sa.String))
+
+    keys = {}
+    for username in bind.scalars(sa.select(users.c.username)):
+        keys.setdefault(username_key(username), []).append(username)
+    clashes = [', '.join(names) for names in keys.values() if len(names) > 1]
+    if clashes:
+        raise RuntimeError('Usernames that differ only in case must be renamed first: ' + '; '.join(clashes))
+
+    if 'username_key' not in {column['name'] for column in inspector.get_columns('users')}:
+        # SQLite only adds NOT NULL columns with a default; every row is backfilled below
+        op.add_column('users', sa.Column('username_key', sa.String(length=255), server_default='', nullable=False))
+    for user_id, username in bind.execute(sa.select(users.c.id, users.c.username)):
+        bind.execute(users.update().where(users.c.id == user_id).values(username_key=username_key(username)))
+
+    # lower(username) index from databases created with db.create_all() before this
+    # column; the inspector does not report expression indexes
+    op.execute('DROP INDEX IF EXISTS ix_users_username_lower')
+    if 'ix_users_username_key' not in {index['name'] for index in inspector.get_indexes('users')}:
+        op.create_index(op.f('ix_users_username_key'), 'users', ['username_key'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_username_key'), table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('username_key')
@@ -0,0 +1,51 @@
+"""add user_stats and profile indexes
+
+Revision ID: 857f502ddffe
+Revises: 881c24876fc1
+Create Date: 2026-10-19 11:53:45.265256
+
+Profiles count live until a user's stats row exists; `flask refresh-user-stats`
+backfills the rows for existing users.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '857f502ddffe'
+down_revision = '881c24876fc1'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('projects', 'owner_id'),
+    ('milestones', 'project_id'),
+    ('comments', 'author_id'),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if 'user_stats' not in inspector.get_table_names():
+        op.create_table('user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('projects_owned', sa.Integer(), nullable=False),
+        sa.Column('collaborations', sa.Integer(), nullable=False),
+        sa.Column('milestones_completed', sa.Integer(), nullable=False),
+        sa.Column('comments', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_stats_user_id_users')),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+
+    for table, column in INDEXES:
+        name = f'ix_{table}_{column}'
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(op.f(name), table, [column], unique=False)
+
+
+def downgrade():
+    for table, column in reversed(INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+    op.drop_table('user_stats')
@@ -0,0 +1,30 @@
+"""add milestones.reminded_due_date
+
+Revision ID: 881c24876fc1
+Revises: 27e6d057ea56
+Create Date: 2026-10-19 11:53:29.124837
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '881c24876fc1'
+down_revision = '27e6d057ea56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'reminded_due_date' not in {column['name'] for column in inspector.get_columns('milestones')}:
+        op.add_column('milestones', sa.Column('reminded_due_date', sa.DateTime(), nullable=True))
+    if 'ix_milestones_open_due_date' not in {index['name'] for index in inspector.get_indexes('milestones')}:
+        op.create_index('ix_milestones_open_due_date', 'milestones', ['is_completed', 'due_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_milestones_open_due_date', table_name='milestones')
+    with op.batch_alter_table('milestones') as batch_op:
+        batch_op.drop_column('reminded_due_date')
@@ -0,0 +1,27 @@
+"""add users.profile_version
+
+Revision ID: 8d005c9d9936
+Revises: 2b7298214b4f
+Create Date: 2026-10-19 11:51:50.352445
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d005c9d9936'
+down_revision = '2b7298214b4f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    if 'profile_version' not in columns:
+        op.add_column('users', sa.Column('profile_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('profile_version')
@@ -4,19 +4,28 @@ from sqlalchemy.orm import validates
 from sqlalchemy_serializer import SerializerMixin
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from routing import RoutingSession
 import re
+import unicodedata
 
 metadata = MetaData(naming_convention={
+    "ix": "ix_%(column_0_label)s",
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 
-db = SQLAlchemy(metadata=metadata)
+db = SQLAlchemy(metadata=metadata, session_options={'class_': RoutingSession})
+
+def username_key(username):
+    """Case- and width-insensitive form of a username, compared on login and kept unique."""
+    return unicodedata.normalize('NFKC', username).casefold()
 
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
+    # username_key(username); unique, so usernames differ in more than case
+    username_key = db.Column(db.String(255), unique=True, index=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     full_name = db.Column(db.String(100), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -34,6 +43,9 @@ class User(db.Model, SerializerMixin):
     is_available = db.Column(db.Boolean, default=True)
     dark_mode = db.Column(db.Boolean, default=False)
     
+    # Bumped on every profile change; embedded in access tokens
+    profile_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -44,7 +56,7 @@ class User(db.Model, SerializerMixin):
     notifications = db.relationship('Notification', backref='user', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='author', lazy=True, cascade='all, delete-orphan')
     
-    serialize_rules = ('-password_hash', '-owned_projects.owner', '-pairing_requests.requester', '-project_collaborations.user', '-notifications.user', '-comments.author')
+    serialize_rules = ('-password_hash', '-username_key', '-owned_projects.owner', '-pairing_requests.requester', '-project_collaborations.user', '-notifications.user', '-comments.author')
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -52,6 +64,11 @@ class User(db.Model, SerializerMixin):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    @validates('username')
+    def validate_username(self, key, username):
+        self.username_key = username_key(username)
+        return username
+    
     @validates('email')
     def validate_email(self, key, email):
         if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
@@ -83,11 +100,14 @@ class Project(db.Model, SerializerMixin):
     is_public = db.Column(db.Boolean, default=True)
     max_collaborators = db.Column(db.Integer, default=5)
     
+    # Set when the owner deletes the project; rows are purged in the background
+    deleted_at = db.Column(db.DateTime, index=True)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     # Relationships
     pairing_requests = db.relationship('PairingRequest', backref='project', lazy=True, cascade='all, delete-orphan')
@@ -95,7 +115,7 @@ class Project(db.Model, SerializerMixin):
     collaborators = db.relationship('ProjectCollaborator', backref='project', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='project', lazy=True, cascade='all, delete-orphan')
     
-    serialize_rules = ('-owner.owned_projects', '-pairing_requests.project', '-milestones.project', '-collaborators.project', '-comments.project')
+    serialize_rules = ('-deleted_at', '-owner.owned_projects', '-pairing_requests.project', '-milestones.project', '-collaborators.project', '-comments.project')
     
     @validates('status')
     def validate_status(self, key, status):
@@ -176,14 +196,19 @@ class Milestone(db.Model, SerializerMixin):
     is_completed = db.Column(db.Boolean, default=False)
     due_date = db.Column(db.DateTime)
     completed_at = db.Column(db.DateTime)
+    # Due date the last reminder was sent for; a new due date gets a new reminder
+    reminded_due_date = db.Column(db.DateTime)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
+    
+    # Range scans for due-date reminders (see reminders.py)
+    __table_args__ = (db.Index('ix_milestones_open_due_date', 'is_completed', 'due_date'),)
     
-    serialize_rules = ('-project.milestones',)
+    serialize_rules = ('-reminded_due_date', '-project.milestones')
     
     def __repr__(self):
         return f'<Milestone {self.title}>'
@@ -218,10 +243,61 @@ class Comment(db.Model, SerializerMixin):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Foreign keys
-    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
     
     serialize_rules = ('-author.comments', '-project.comments')
     
     def __repr__(self):
         return f'<Comment by {self.author.username}>'
+
+class UserStats(db.Model, SerializerMixin):
+    __tablename__ = 'user_stats'
+    
+    # Contribution counts shown on public profiles, recomputed whenever they can
+    # change (see stats.py); deleted projects and their children do not count
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    projects_owned = db.Column(db.Integer, nullable=False, default=0)
+    collaborations = db.Column(db.Integer, nullable=False, default=0)
+    milestones_completed = db.Column(db.Integer, nullable=False, default=0)  # in projects the user owns
+    comments = db.Column(db.Integer, nullable=False, default=0)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+
+class ChangeLog(db.Model, SerializerMixin):
+    __tablename__ = 'change_log'
+    
+    seq = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(30), nullable=False)  # project, milestone, comment, pairing_request, collaborator
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False, default='upsert')  # upsert, delete
+    
+    # Scope used for visibility; no foreign keys so entries outlive purged rows
+    project_id = db.Column(db.Integer, index=True)
+    user_id = db.Column(db.Integer)  # requester for pairing requests, member for collaborators
+    # Project scope captured on deletions (checked once the project is purged) and on
+    # changes that hid the project, so callers who could see it before get a deletion
+    owner_id = db.Column(db.Integer)
+    is_public = db.Column(db.Boolean)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.Index('ix_change_log_entity', 'entity_type', 'entity_id'),)
+    
+    def __repr__(self):
+        return f'<ChangeLog {self.seq} {self.op} {self.entity_type} {self.entity_id}>'
+
+class Watermark(db.Model, SerializerMixin):
+    __tablename__ = 'watermarks'
+    
+    # Named progress markers for background jobs (e.g. change-log compaction)
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(64), nullable=False)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Watermark {self.name}={self.value}>'
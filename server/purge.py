@@ -0,0 +1,82 @@
+from sqlalchemy import delete, select
+from models import db, Project, PairingRequest, ProjectCollaborator, Milestone, Comment
+from queue import Queue
+from threading import Lock, Thread
+
+# Child tables are purged first so the project row goes last
+PROJECT_CHILDREN = (Comment, Milestone, ProjectCollaborator, PairingRequest)
+
+
+def purge_project(project_id, chunk_size=500):
+    """Delete a project and its children with chunked set-based DELETEs.
+
+    Each chunk commits on its own so the write lock is released between
+    chunks instead of being held for the whole project.
+    """
+    for model in PROJECT_CHILDREN:
+        while True:
+            chunk = select(model.id).where(model.project_id == project_id).limit(chunk_size).scalar_subquery()
+            deleted = db.session.execute(
+                delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.session.commit()
+            if deleted < chunk_size:
+                break
+
+    db.session.execute(
+        delete(Project).where(Project.id == project_id).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def purge_deleted_projects(chunk_size=500):
+    """Purge every soft-deleted project, e.g. ones left behind by a restart."""
+    project_ids = db.session.scalars(select(Project.id).where(Project.deleted_at.isnot(None))).all()
+    for project_id in project_ids:
+        purge_project(project_id, chunk_size)
+    return len(project_ids)
+
+
+class ProjectPurger:
+    """Background thread that purges soft-deleted projects queued by the delete route."""
+
+    def __init__(self, app):
+        self.app = app
+        self.chunk_size = app.config.get('PURGE_CHUNK_SIZE', 500)
+        self._queue = Queue()
+        self._thread = None
+        self._lock = Lock()
+
+    def enqueue(self, project_id):
+        # Started lazily so each forked worker gets its own thread
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put(project_id)
+
+    def _run(self):
+        while True:
+            project_id = self._queue.get()
+            with self.app.app_context():
+                try:
+                    purge_project(project_id, self.chunk_size)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.warning('Purging project %s failed: %s', project_id, e)
+            self._queue.task_done()
+
+    def join(self):
+        self._queue.join()
+
+
+def init_purger(app):
+    purger = ProjectPurger(app)
+    app.extensions['project_purger'] = purger
+
+    @app.cli.command('purge-projects')
+    def purge_projects_command():
+        """Purge soft-deleted projects that are still in the database."""
+        print(f'Purged {purge_deleted_projects(purger.chunk_size)} project(s)')
+
+    return purger
@@ -0,0 +1,116 @@
+from flask import g, jsonify, request
+from identity import request_identity
+from importlib import import_module
+from threading import BoundedSemaphore, Lock
+import math
+import time
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'10/minute' -> (capacity 10, refill 10/60 tokens per second)."""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+class RateLimitBackend:
+    """Token-bucket storage. Shared backends must make take() atomic across processes."""
+
+    def take(self, key, capacity, refill_rate, cost=1):
+        """Consume cost tokens; return (allowed, seconds until enough tokens)."""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process buckets; also the local stand-in for a shared backend."""
+
+    def __init__(self, app=None, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = Lock()
+
+    def take(self, key, capacity, refill_rate, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > self.max_keys:
+                self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < 3600}
+
+        return allowed, 0 if allowed else (cost - tokens) / refill_rate
+
+
+def load_backend(app):
+    backend = app.config.get('RATELIMIT_BACKEND', 'memory')
+    if backend == 'memory':
+        return MemoryBackend(app)
+    module_name, class_name = backend.split(':')
+    return getattr(import_module(module_name), class_name)(app)
+
+
+def _overloaded(status, message, retry_after):
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def init_rate_limits(app):
+    """Apply RATE_LIMITS token buckets and concurrency caps before every request."""
+    backend = load_backend(app)
+    limits = {
+        endpoint: {scope: parse_rate(rate) for scope, rate in scopes.items()}
+        for endpoint, scopes in app.config.get('RATE_LIMITS', {}).items()
+    }
+    global_cap = app.config.get('MAX_CONCURRENT_REQUESTS')
+    global_slots = BoundedSemaphore(global_cap) if global_cap else None
+    route_slots = {
+        endpoint: BoundedSemaphore(cap)
+        for endpoint, cap in app.config.get('ROUTE_CONCURRENCY', {}).items()
+    }
+    app.extensions['ratelimit'] = backend
+
+    @app.before_request
+    def admit_request():
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+
+        # '*' buckets are shared by all routes; named ones are per endpoint
+        for prefix in ('*', request.endpoint):
+            for scope, (capacity, refill_rate) in limits.get(prefix, {}).items():
+                if scope == 'user':
+                    subject = request_identity()
+                    if subject is None:
+                        continue
+                elif scope == 'ip':
+                    subject = request.remote_addr
+                else:
+                    subject = 'all'
+
+                allowed, retry_after = backend.take(f'{prefix}:{scope}:{subject}', capacity, refill_rate)
+                if not allowed:
+                    return _overloaded(429, 'Too many requests', retry_after)
+
+        # Shed load instead of queueing once the worker is at capacity
+        g.admission_slots = []
+        for slots in (global_slots, route_slots.get(request.endpoint)):
+            if slots is None:
+                continue
+            if not slots.acquire(blocking=False):
+                return _overloaded(503, 'Server is busy, please retry', 1)
+            g.admission_slots.append(slots)
+        return None
+
+    @app.teardown_request
+    def release_slots(exc):
+        for slots in g.pop('admission_slots', []):
+            slots.release()
+
+    return backend
@@ -0,0 +1,73 @@
+from sqlalchemy import func, select
+from models import Project, Milestone, Notification, Comment
+from math import ceil
+
+# Read-only route bodies shared by the Flask views and the async read path
+# (asgi.py), which runs them through AsyncSession.run_sync. Each takes the
+# session to query with and returns the JSON payload.
+
+
+def project_page(session, fieldset, page=1, per_page=10, search='', status='', difficulty=''):
+    """One page of public projects, newest first; same shape and paging rules as Flask-SQLAlchemy's paginate."""
+    query = select(Project).filter_by(is_public=True, deleted_at=None)
+
+    if search:
+        query = query.where(Project.title.contains(search) | Project.description.contains(search))
+
+    if status:
+        query = query.filter_by(status=status)
+
+    if difficulty:
+        query = query.filter_by(difficulty_level=difficulty)
+
+    current_page = page
+    page = max(page, 1)
+    per_page = per_page if per_page >= 1 else 20
+
+    total = session.scalar(select(func.count()).select_from(query.subquery()))
+    projects = session.scalars(
+        query.options(*fieldset.options())
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(per_page).offset((page - 1) * per_page)
+    ).all()
+
+    return {
+        'projects': [fieldset.serialize(project) for project in projects],
+        'total': total,
+        'pages': ceil(total / per_page) if total else 0,
+        'current_page': current_page
+    }
+
+
+def project_detail(session, fieldset, project_id):
+    """The project's payload, or None when it does not exist."""
+    project = session.scalars(
+        select(Project).options(*fieldset.options()).filter_by(id=project_id, deleted_at=None)
+    ).first()
+    return fieldset.serialize(project) if project is not None else None
+
+
+def project_milestones(session, fieldset, project_id):
+    milestones = session.scalars(
+        select(Milestone).options(*fieldset.options())
+        .join(Milestone.project).where(Milestone.project_id == project_id, Project.deleted_at.is_(None))
+        .order_by(Milestone.created_at.asc())
+    )
+    return [fieldset.serialize(milestone) for milestone in milestones]
+
+
+def project_comments(session, fieldset, project_id):
+    comments = session.scalars(
+        select(Comment).options(*fieldset.options())
+        .join(Comment.project).where(Comment.project_id == project_id, Project.deleted_at.is_(None))
+        .order_by(Comment.created_at.asc())
+    )
+    return [fieldset.serialize(comment) for comment in comments]
+
+
+def user_notifications(session, fieldset, user_id):
+    notifications = session.scalars(
+        select(Notification).options(*fieldset.options()).filter_by(user_id=user_id)
+        .order_by(Notification.created_at.desc())
+    )
+    return [fieldset.serialize(notification) for notification in notifications]
@@ -0,0 +1,173 @@
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, Milestone, Notification, Project, ProjectCollaborator, Watermark
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+import click
+import time
+
+# Start time of the last completed reminder run
+WATERMARK = 'milestone_reminders'
+
+
+def _last_run():
+    watermark = db.session.get(Watermark, WATERMARK, populate_existing=True)
+    return datetime.fromisoformat(watermark.value) if watermark else None
+
+
+def _record_run(started_at):
+    value = started_at.strftime('%Y-%m-%dT%H:%M:%S.%f')  # fixed width, so it compares as text
+    updated = db.session.execute(
+        update(Watermark)
+        .where(Watermark.name == WATERMARK, Watermark.value < value)
+        .values(value=value, updated_at=datetime.utcnow())
+    ).rowcount
+    if not updated and db.session.get(Watermark, WATERMARK) is None:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Watermark).values(name=WATERMARK, value=value))
+        except IntegrityError:
+            pass  # another worker recorded its run first
+    db.session.commit()
+
+
+def _recipients(project_ids):
+    projects = {}
+    for project_id, owner_id, title in db.session.execute(
+        select(Project.id, Project.owner_id, Project.title)
+        .where(Project.id.in_(project_ids), Project.deleted_at.is_(None))
+    ):
+        projects[project_id] = (title, {owner_id})
+    for project_id, user_id in db.session.execute(
+        select(ProjectCollaborator.project_id, ProjectCollaborator.user_id)
+        .where(ProjectCollaborator.project_id.in_(list(projects)))
+    ):
+        projects[project_id][1].add(user_id)
+    return projects
+
+
+def remind_batch(window_start, now, lead_hours=24, batch_size=500):
+    """Claim and notify the next batch of open milestones coming due; return (sent, more)."""
+    not_reminded = or_(Milestone.reminded_due_date.is_(None), Milestone.reminded_due_date != Milestone.due_date)
+
+    # Range scan over ix_milestones_open_due_date
+    ids = db.session.scalars(
+        select(Milestone.id)
+        .where(
+            Milestone.is_completed.is_(False),
+            Milestone.due_date > window_start,
+            Milestone.due_date <= now + timedelta(hours=lead_hours),
+            not_reminded,
+        )
+        .order_by(Milestone.due_date, Milestone.id)
+        .limit(batch_size)
+    ).all()
+    if not ids:
+        db.session.rollback()
+        return 0, False
+
+    # Conditional claim: rows another worker reminded about in the meantime drop out
+    milestones = db.session.execute(
+        update(Milestone)
+        .where(Milestone.id.in_(ids), Milestone.is_completed.is_(False), not_reminded)
+        .values(reminded_due_date=Milestone.due_date, updated_at=Milestone.updated_at)
+        .returning(Milestone.id, Milestone.title, Milestone.due_date, Milestone.project_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    projects = _recipients({milestone.project_id for milestone in milestones})
+    notifications = []
+    for milestone in sorted(milestones, key=lambda m: (m.due_date, m.id)):
+        if milestone.project_id not in projects:
+            continue
+        project_title, user_ids = projects[milestone.project_id]
+        due = milestone.due_date.strftime('%Y-%m-%d %H:%M')
+        if milestone.due_date < now:
+            title, message = 'Milestone overdue', f'"{milestone.title}" in {project_title} was due {due}'
+        else:
+            title, message = 'Milestone due soon', f'"{milestone.title}" in {project_title} is due {due}'
+        notifications.extend(
+            {'user_id': user_id, 'title': title, 'message': message, 'type': 'milestone',
+             'is_read': False, 'created_at': now}
+            for user_id in sorted(user_ids)
+        )
+
+    if notifications:
+        db.session.execute(insert(Notification), notifications)
+    # Claims and notifications commit together, so each due date is reminded about once
+    db.session.commit()
+    return len(notifications), len(ids) == batch_size
+
+
+def send_due_reminders(lead_hours=24, batch_size=500, lookback_hours=24):
+    """Notify about milestones that came due since the last run, in bounded batches.
+
+    The window reaches lookback_hours behind the last completed run (or behind
+    now on the first run), so downtime is caught up without rescanning history.
+    """
+    now = datetime.utcnow()
+    window_start = (_last_run() or now) - timedelta(hours=lookback_hours)
+    total = 0
+    more = True
+    while more:
+        sent, more = remind_batch(window_start, now, lead_hours, batch_size)
+        total += sent
+    _record_run(now)
+    return total
+
+
+class ReminderScheduler:
+    """Background thread that sends due-date reminders every MILESTONE_REMINDER_INTERVAL seconds."""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = app.config.get('MILESTONE_REMINDER_INTERVAL', 0)
+        self._thread = None
+        self._lock = Lock()
+
+    def run_once(self):
+        config = self.app.config
+        with self.app.app_context():
+            try:
+                return send_due_reminders(
+                    config['MILESTONE_REMINDER_LEAD_HOURS'],
+                    config['MILESTONE_REMINDER_BATCH'],
+                    config['MILESTONE_REMINDER_LOOKBACK_HOURS'],
+                )
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.warning('Sending milestone reminders failed: %s', e)
+                return 0
+
+    def start(self):
+        # Started lazily so each forked worker gets its own thread
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.run_once()
+
+
+def init_reminders(app):
+    scheduler = ReminderScheduler(app)
+    app.extensions['reminder_scheduler'] = scheduler
+
+    if scheduler.interval:
+        @app.before_request
+        def start_reminder_scheduler():
+            scheduler.start()
+
+    @app.cli.command('send-reminders')
+    @click.option('--loop', is_flag=True, help='Keep running every MILESTONE_REMINDER_INTERVAL seconds.')
+    def send_reminders_command(loop):
+        """Notify owners and collaborators about milestones coming due."""
+        print(f'Sent {scheduler.run_once()} reminder(s)')
+        while loop:
+            time.sleep(scheduler.interval or 60)
+            print(f'Sent {scheduler.run_once()} reminder(s)')
+
+    return scheduler
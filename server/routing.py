@@ -0,0 +1,131 @@
+from flask import current_app, g, has_request_context, request
+from identity import request_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from threading import Lock, Thread
+import itertools
+import sqlite3
+import time
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingSession(Session):
+    """Session that sends reads of read-only requests to the replica picked for the request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReadReplicas:
+    """Replica engines plus the read-your-writes window of recent writers."""
+
+    def __init__(self, engines, sticky_seconds):
+        self.engines = engines
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.cycle(range(len(engines)))
+        self._sticky_until = {}
+        self._lock = Lock()
+
+    def pick(self):
+        with self._lock:
+            return self.engines[next(self._next)]
+
+    def mark_writer(self, keys):
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                self._sticky_until[key] = now + self.sticky_seconds
+            # Drop expired windows so the map only holds recent writers
+            if len(self._sticky_until) > 1000:
+                self._sticky_until = {k: v for k, v in self._sticky_until.items() if v > now}
+
+    def is_sticky(self, keys):
+        now = time.monotonic()
+        return any(self._sticky_until.get(key, 0) > now for key in keys)
+
+
+def _requester_keys():
+    # Keyed on the caller alone: behind a proxy every client shares one address
+    identity = request_identity()
+    return [('user', identity)] if identity is not None else []
+
+
+def remember_writer(identity):
+    """Count this request's writes toward identity too, for writes made before the client holds a token."""
+    if has_request_context():
+        g.setdefault('db_requesters', []).append(('user', identity))
+
+
+def copy_to_replicas(app):
+    """Replication stand-in for local SQLite setups: copy the primary file into every replica."""
+    replicas = app.extensions.get('db_replicas')
+    if replicas is None:
+        return 0
+
+    with app.app_context():
+        primary_path = app.extensions['sqlalchemy'].engine.url.database
+
+    source = sqlite3.connect(primary_path)
+    try:
+        for engine in replicas.engines:
+            target = sqlite3.connect(engine.url.database)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+    return len(replicas.engines)
+
+
+def _replicate_forever(app, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            copy_to_replicas(app)
+        except sqlite3.Error as e:
+            app.logger.warning('Replica copy failed: %s', e)
+
+
+def init_read_replicas(app, on_engine=None):
+    """Route read-only requests to DB_REPLICA_URLS; no-op when none are configured."""
+    urls = app.config.get('DB_REPLICA_URLS')
+    if not urls:
+        return None
+
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    engines = [create_engine(url, **options) for url in urls]
+    for engine in engines:
+        if on_engine is not None:
+            on_engine(engine)
+
+    replicas = ReadReplicas(engines, app.config.get('DB_READ_STICKY_SECONDS', 5))
+    app.extensions['db_replicas'] = replicas
+
+    @app.before_request
+    def choose_database():
+        g.db_requesters = _requester_keys()
+        if request.method in READ_METHODS and not replicas.is_sticky(g.db_requesters):
+            g.db_replica = replicas.pick()
+
+    @app.after_request
+    def mark_recent_writer(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            replicas.mark_writer(g.get('db_requesters', []))
+        return response
+
+    @app.cli.command('replicate')
+    def replicate_command():
+        """Copy the primary SQLite database into the replica files."""
+        print(f'Copied primary to {copy_to_replicas(current_app)} replica(s)')
+
+    interval = app.config.get('DB_REPLICA_SYNC_INTERVAL', 0)
+    if interval:
+        Thread(target=_replicate_forever, args=(app, interval), daemon=True).start()
+
+    return replicas
@@ -0,0 +1,93 @@
+"""Production launcher: gunicorn prefork workers with fork-safe engines and warm-up.
+
+    python serve.py --bind 0.0.0.0:5000 --workers 4 --threads 4 --preload
+
+Never runs schema DDL; migrate the database before deploying with
+`flask db upgrade` (see migrations/README), or run seed.py for a fresh
+development database.
+"""
+import time
+
+BOOT_STARTED = time.perf_counter()
+
+from app import create_app
+from database import dispose_engines
+from warmup import warm_up
+import argparse
+import logging
+import os
+
+logger = logging.getLogger('devpair.serve')
+
+
+def build_application(options, config_name):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit('serve.py needs gunicorn: pip install gunicorn')
+
+    class DevPairApplication(BaseApplication):
+        def __init__(self):
+            self.application = None
+            super().__init__()
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            if self.application is None:
+                started = time.perf_counter()
+                self.application = create_app(config_name)
+                logger.info('[%s] App created in %.1fms', os.getpid(), (time.perf_counter() - started) * 1000)
+
+                # With --preload this runs once in the master: everything but the
+                # pools is warmed before fork and shared copy-on-write by workers
+                if self.cfg.preload_app:
+                    warm_up(self.application, prime_pools=False, log=logger)
+            return self.application
+
+    def post_fork(server, worker):
+        # Connections opened in the master must not be shared with the children
+        application = server.app.application
+        if application is not None:
+            dispose_engines(application, close=False)
+
+    def post_worker_init(worker):
+        forked = time.perf_counter()
+        warm_up(worker.wsgi, log=logger)
+        logger.info('[%s] Worker ready in %.1fms', worker.pid, (time.perf_counter() - forked) * 1000)
+
+    def when_ready(server):
+        logger.info('Master ready in %.1fms after launch', (time.perf_counter() - BOOT_STARTED) * 1000)
+
+    options.update(post_fork=post_fork, post_worker_init=post_worker_init, when_ready=when_ready)
+    return DevPairApplication()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the DevPair API with gunicorn.')
+    parser.add_argument('--bind', default=os.environ.get('BIND', '0.0.0.0:5000'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WORKER_THREADS', 1)),
+                        help='threads per worker; >1 uses the gthread worker')
+    parser.add_argument('--preload', action='store_true', help='load and warm the app in the master before forking')
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--config', default=os.environ.get('FLASK_ENV', 'production'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    options = {
+        'bind': args.bind,
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread' if args.threads > 1 else 'sync',
+        'preload_app': args.preload,
+        'timeout': args.timeout,
+    }
+    build_application(options, args.config).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+from sqlalchemy import func, insert, select, union, update
+from sqlalchemy.exc import IntegrityError
+from models import db, User, UserStats, Project, ProjectCollaborator, Milestone, Comment
+from datetime import datetime
+
+STAT_FIELDS = ('projects_owned', 'collaborations', 'milestones_completed', 'comments')
+
+
+def _counts(user_id):
+    """Scalar subqueries computing every stat for a user from the source tables."""
+    live = Project.deleted_at.is_(None)
+    return {
+        'projects_owned': select(func.count(Project.id))
+            .where(Project.owner_id == user_id, live).scalar_subquery(),
+        'collaborations': select(func.count(ProjectCollaborator.id))
+            .join(Project, Project.id == ProjectCollaborator.project_id)
+            .where(ProjectCollaborator.user_id == user_id, live).scalar_subquery(),
+        'milestones_completed': select(func.count(Milestone.id))
+            .join(Project, Project.id == Milestone.project_id)
+            .where(Project.owner_id == user_id, live, Milestone.is_completed.is_(True)).scalar_subquery(),
+        'comments': select(func.count(Comment.id))
+            .join(Project, Project.id == Comment.project_id)
+            .where(Comment.author_id == user_id, live).scalar_subquery(),
+    }
+
+
+def refresh_user_stats(*user_ids):
+    """Recompute the stats rows of the given users in the caller's transaction."""
+    for user_id in sorted({user_id for user_id in user_ids if user_id is not None}):
+        values = {**_counts(user_id), 'updated_at': datetime.utcnow()}
+        updated = db.session.execute(
+            update(UserStats).where(UserStats.user_id == user_id).values(**values)
+        ).rowcount
+        if updated:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(UserStats).values(user_id=user_id, **values))
+        except IntegrityError:
+            # Created concurrently; recompute over it
+            db.session.execute(update(UserStats).where(UserStats.user_id == user_id).values(**values))
+
+
+def refresh_project_owner_stats(project_id):
+    refresh_user_stats(db.session.scalar(select(Project.owner_id).where(Project.id == project_id)))
+
+
+def project_participants(project_id):
+    """Owner, collaborators and commenters: everyone whose stats a project's removal changes."""
+    return set(db.session.scalars(union(
+        select(Project.owner_id).where(Project.id == project_id),
+        select(ProjectCollaborator.user_id).where(ProjectCollaborator.project_id == project_id),
+        select(Comment.author_id).where(Comment.project_id == project_id),
+    )))
+
+
+def user_stats(user_id):
+    """Stats for a profile: the maintained row, or a live count for users without one yet."""
+    row = db.session.get(UserStats, user_id)
+    if row is not None:
+        return {field: getattr(row, field) for field in STAT_FIELDS}
+    counts = db.session.execute(select(*[
+        subquery.label(field) for field, subquery in _counts(user_id).items()
+    ])).one()
+    return dict(counts._mapping)
+
+
+def refresh_all_user_stats(batch_size=500):
+    """Recompute every user's stats row, committing per batch; returns the user count."""
+    last_id = 0
+    total = 0
+    while True:
+        user_ids = db.session.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        ).all()
+        if not user_ids:
+            return total
+        refresh_user_stats(*user_ids)
+        db.session.commit()
+        total += len(user_ids)
+        last_id = user_ids[-1]
+
+
+def init_user_stats(app):
+    @app.cli.command('refresh-user-stats')
+    def refresh_user_stats_command():
+        """Backfill or repair the user_stats rows behind public profiles."""
+        print(f'Refreshed stats for {refresh_all_user_stats()} user(s)')
@@ -0,0 +1,55 @@
+from app import create_app
+from config import DevelopmentConfig, config
+from models import db
+import pytest
+
+
+@pytest.fixture
+def client(tmp_path):
+    class TestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+        RATE_LIMITS = {}
+
+    config['test'] = TestConfig
+    app = create_app('test')
+    with app.app_context():
+        db.create_all()
+    yield app.test_client()
+    with app.app_context():
+        db.engine.dispose()
+
+
+def register(client, username, email):
+    return client.post('/api/auth/register', json={
+        'username': username, 'email': email, 'full_name': 'Test User', 'password': 'secret123'
+    })
+
+
+def login(client, username):
+    return client.post('/api/auth/login', json={'username': username, 'password': 'secret123'})
+
+
+def test_login_ignores_case_of_non_ascii_username(client):
+    user_id = register(client, 'Élodie', 'elodie@example.com').get_json()['user']['id']
+
+    for username in ('Élodie', 'élodie', 'ÉLODIE'):
+        response = login(client, username)
+        assert response.status_code == 200
+        assert response.get_json()['user']['id'] == user_id
+
+
+def test_register_rejects_usernames_differing_only_in_case(client):
+    assert register(client, 'Élodie', 'elodie@example.com').status_code == 201
+    assert register(client, 'Straße', 'strasse@example.com').status_code == 201
+
+    for username, email in (('élodie', 'other@example.com'), ('STRASSE', 'other2@example.com')):
+        response = register(client, username, email)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'Username already exists'
+
+
+def test_login_rejects_wrong_password(client):
+    register(client, 'Élodie', 'elodie@example.com')
+
+    response = client.post('/api/auth/login', json={'username': 'élodie', 'password': 'wrong'})
+    assert response.status_code == 401
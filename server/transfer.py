@@ -0,0 +1,263 @@
+from sqlalchemy import Integer, insert, select, text, update
+from models import db, Watermark
+from datetime import date, datetime
+import click
+import csv
+import gzip
+import io
+import json
+import os
+
+FORMATS = ('ndjson', 'csv')
+CSV_NULL = '\\N'
+EXPORT_CHECKPOINT = 'export-checkpoint.json'
+
+# Operational state (job watermarks, import checkpoints) is not data to move
+SKIPPED_TABLES = {'watermarks'}
+
+
+def transfer_tables(names=None):
+    """Tables in foreign-key order: every table comes after the tables it references."""
+    tables = [table for table in db.metadata.sorted_tables if table.name not in SKIPPED_TABLES]
+    if names:
+        unknown = set(names) - {table.name for table in tables}
+        if unknown:
+            raise click.BadParameter(f'Unknown table(s): {", ".join(sorted(unknown))}')
+        tables = [table for table in tables if table.name in names]
+    return tables
+
+
+def _primary_key(table):
+    columns = list(table.primary_key.columns)
+    if len(columns) != 1:
+        raise click.ClickException(f'{table.name} needs a single-column primary key to be streamed')
+    return columns[0]
+
+
+def _encode(value, for_csv):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if for_csv:
+        if value is None:
+            return CSV_NULL
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+    return value
+
+
+def _decoder(column):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = str
+
+    def decode(value):
+        if value is None or value == CSV_NULL:
+            return None
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is bool and isinstance(value, str):
+            return value == 'true'
+        if python_type in (int, float) and isinstance(value, str):
+            return python_type(value)
+        return value
+
+    return decode
+
+
+def _data_path(directory, table, fmt, compressed):
+    return os.path.join(directory, f'{table.name}.{fmt}' + ('.gz' if compressed else ''))
+
+
+def _encode_batch(rows, columns, fmt):
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_encode(value, True) for value in row])
+    else:
+        for row in rows:
+            buffer.write(json.dumps({
+                column: _encode(value, False) for column, value in zip(columns, row)
+            }, separators=(',', ':')))
+            buffer.write('\n')
+    return buffer.getvalue().encode()
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def export_data(directory, fmt='ndjson', compressed=False, batch_size=1000, tables=None, restart=False, log=print):
+    """Stream tables to one file each through a server-side cursor, resumably.
+
+    Each batch is appended as a unit (its own gzip member when compressed) and
+    then checkpointed with the last primary key and the file offset, so a
+    resumed export truncates a half-written batch and continues after that key.
+    """
+    os.makedirs(directory, exist_ok=True)
+    checkpoint_path = os.path.join(directory, EXPORT_CHECKPOINT)
+    checkpoint = None
+    if not restart and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if (checkpoint['format'], checkpoint['gzip']) != (fmt, compressed):
+            raise click.ClickException('An export with another format is in progress here; use --restart')
+    if checkpoint is None:
+        checkpoint = {'format': fmt, 'gzip': compressed, 'tables': {}}
+
+    for table in transfer_tables(tables):
+        key = _primary_key(table)
+        state = checkpoint['tables'].get(table.name)
+        if state and state['done']:
+            log(f'{table.name}: already exported ({state["rows"]} rows)')
+            continue
+
+        path = _data_path(directory, table, fmt, compressed)
+        columns = [column.name for column in table.columns]
+        if state is None:
+            state = {'last_key': None, 'offset': 0, 'rows': 0, 'done': False}
+            with open(path, 'wb') as f:
+                if fmt == 'csv':
+                    header = _encode_batch([columns], columns, fmt)
+                    f.write(gzip.compress(header) if compressed else header)
+                state['offset'] = f.tell()
+            checkpoint['tables'][table.name] = state
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+        query = select(table).order_by(key)
+        if state['last_key'] is not None:
+            query = query.where(key > state['last_key'])
+
+        with open(path, 'r+b') as f, db.engine.connect() as connection:
+            f.truncate(state['offset'])
+            f.seek(state['offset'])
+            result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+            for rows in result.partitions():
+                data = _encode_batch(rows, columns, fmt)
+                f.write(gzip.compress(data) if compressed else data)
+                f.flush()
+                os.fsync(f.fileno())
+                state.update(last_key=rows[-1]._mapping[key.name], offset=f.tell(), rows=state['rows'] + len(rows))
+                _save_checkpoint(checkpoint_path, checkpoint)
+
+        state['done'] = True
+        _save_checkpoint(checkpoint_path, checkpoint)
+        log(f'{table.name}: exported {state["rows"]} rows to {path}')
+
+    return checkpoint
+
+
+def _find_data_file(directory, table):
+    for fmt in FORMATS:
+        for compressed in (False, True):
+            path = _data_path(directory, table, fmt, compressed)
+            if os.path.exists(path):
+                return path, fmt, compressed
+    return None, None, None
+
+
+def _read_records(path, fmt, compressed, skip=0):
+    """Yield row dicts one at a time after the first skip; NULLs in CSV files are still CSV_NULL here."""
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', newline='') as f:
+        if fmt == 'csv':
+            for index, record in enumerate(csv.DictReader(f)):
+                if index >= skip:
+                    yield record
+        else:
+            lines = (line for line in f if line.strip())
+            for index, line in enumerate(lines):
+                # Already-loaded lines are counted, not parsed
+                if index >= skip:
+                    yield json.loads(line)
+
+
+def _checkpoint_name(table):
+    return f'import:{table.name}'
+
+
+def _reset_sequence(table, key):
+    # Rows arrive with explicit ids, so PostgreSQL serial sequences must catch up
+    if db.engine.dialect.name == 'postgresql' and isinstance(key.type, Integer):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', '{key.name}'), "
+            f"COALESCE((SELECT MAX({key.name}) FROM {table.name}), 1))"
+        ))
+
+
+def import_data(directory, batch_size=1000, tables=None, restart=False, log=print):
+    """Load exported files in foreign-key order with batched multi-row INSERTs.
+
+    The number of records loaded per table is kept in the watermarks table and
+    committed with each batch, so a rerun skips exactly what is already in.
+    """
+    for table in transfer_tables(tables):
+        path, fmt, compressed = _find_data_file(directory, table)
+        if path is None:
+            log(f'{table.name}: no export file, skipped')
+            continue
+
+        name = _checkpoint_name(table)
+        watermark = db.session.get(Watermark, name)
+        if restart and watermark is not None:
+            db.session.delete(watermark)
+            db.session.commit()
+            watermark = None
+        if watermark is None:
+            db.session.execute(insert(Watermark).values(name=name, value='0'))
+            db.session.commit()
+        loaded = int(watermark.value) if watermark else 0
+
+        decoders = {column.name: _decoder(column) for column in table.columns}
+        batch = []
+
+        def flush():
+            nonlocal loaded
+            db.session.execute(insert(table), batch)
+            loaded += len(batch)
+            db.session.execute(
+                update(Watermark).where(Watermark.name == name).values(value=str(loaded), updated_at=datetime.utcnow())
+            )
+            db.session.commit()
+            batch.clear()
+
+        for record in _read_records(path, fmt, compressed, skip=loaded):
+            batch.append({
+                column: decoders[column](value) for column, value in record.items() if column in decoders
+            })
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        _reset_sequence(table, _primary_key(table))
+        db.session.commit()
+        log(f'{table.name}: {loaded} rows loaded from {path}')
+
+
+def init_transfer(app):
+    @app.cli.command('export-data')
+    @click.argument('directory')
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS), default='ndjson')
+    @click.option('--gzip', 'compressed', is_flag=True, help='Write .gz files.')
+    @click.option('--batch-size', default=1000, show_default=True)
+    @click.option('--tables', default='', help='Comma-separated subset of tables.')
+    @click.option('--restart', is_flag=True, help='Ignore the checkpoint of an interrupted export.')
+    def export_data_command(directory, fmt, compressed, batch_size, tables, restart):
+        """Stream every table to NDJSON or CSV files in DIRECTORY."""
+        export_data(directory, fmt, compressed, batch_size, [t for t in tables.split(',') if t], restart)
+
+    @app.cli.command('import-data')
+    @click.argument('directory')
+    @click.option('--batch-size', default=1000, show_default=True)
+    @click.option('--tables', default='', help='Comma-separated subset of tables.')
+    @click.option('--restart', is_flag=True, help='Ignore the checkpoints of an interrupted import.')
+    def import_data_command(directory, batch_size, tables, restart):
+        """Load files written by export-data from DIRECTORY, resuming where a previous run stopped."""
+        import_data(directory, batch_size, [t for t in tables.split(',') if t], restart)
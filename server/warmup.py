@@ -0,0 +1,54 @@
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from database import app_engines
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _prime_pool(engine):
+    # Open up to pool_size connections at once so the pool is full before traffic
+    size = getattr(engine.pool, 'size', lambda: 1)()
+    connections = [engine.connect() for _ in range(size)]
+    try:
+        for connection in connections:
+            connection.execute(text('SELECT 1'))
+    finally:
+        for connection in connections:
+            connection.close()
+    return size
+
+
+def warm_up(app, prime_pools=True, log=logger):
+    """Do the first-request work up front and log how long each phase took."""
+    timings = {}
+
+    def phase(name, fn):
+        started = time.perf_counter()
+        result = fn()
+        timings[name] = time.perf_counter() - started
+        return result
+
+    phase('mappers', configure_mappers)
+    phase('routes', app.url_map.update)
+
+    if prime_pools:
+        connections = phase('pools', lambda: sum(_prime_pool(engine) for engine in app_engines(app)))
+    else:
+        connections = 0
+
+    def warm_requests():
+        client = app.test_client()
+        return [client.get(path).status_code for path in app.config.get('WARMUP_PATHS', [])]
+
+    statuses = phase('requests', warm_requests)
+
+    log.info(
+        'Warm-up finished in %.1fms (%s); %d pooled connections, warm-up requests %s',
+        sum(timings.values()) * 1000,
+        ', '.join(f'{name} {seconds * 1000:.1f}ms' for name, seconds in timings.items()),
+        connections,
+        statuses
+    )
+    return timings